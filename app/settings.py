@@ -57,6 +57,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -85,14 +86,75 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# core.db.backends.mysql keeps a bounded pool of persistent connections per process (see core.db.pool), so a
+# request reuses a connection instead of paying for a new TCP and auth handshake.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "core.db.backends.mysql",
         "NAME": os.environ.get("DB_NAME"),
         "HOST": os.environ.get("DB_HOST"),
         "USER": os.environ.get("DB_USER"),
         "PASSWORD": os.environ.get("DB_PASS"),
         "PORT": 3306,
+        "POOL": {
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "MAX_AGE": int(os.environ.get("DB_POOL_MAX_AGE", 600)),
+            "HEALTH_CHECK_INTERVAL": int(
+                os.environ.get("DB_POOL_HEALTH_CHECK_INTERVAL", 30)
+            ),
+            "TIMEOUT": int(os.environ.get("DB_POOL_TIMEOUT", 5)),
+        },
+    }
+}
+
+# Read replicas, one per host in DB_REPLICA_HOSTS (comma separated). core.routers.ReplicaRouter sends the reads
+# of GET/HEAD requests to a healthy replica and pins a user to the primary for REPLICA_PIN_SECONDS after a write.
+# The pins are kept in the cache, so replicas require a CACHE_BACKEND shared by every process (check core.E001).
+REPLICA_DATABASES = []
+for index, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(","))
+):
+    alias = f"replica{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", 2))
+REPLICA_HEALTH_CHECK_INTERVAL = float(
+    os.environ.get("REPLICA_HEALTH_CHECK_INTERVAL", 5)
+)
+
+
+# Authors with more followers than this are not fanned out to timelines on post, see core.feed.
+FEED_FANOUT_MAX_FOLLOWERS = int(os.environ.get("FEED_FANOUT_MAX_FOLLOWERS", 10000))
+
+# Write-behind post counters (see core.counters): like and comment deltas are buffered in the cache and written by a
+# flusher thread per worker every COUNTER_FLUSH_INTERVAL_MS. Needs a shared cache that does not evict the buffer
+# and increments atomically, e.g. memcached or Redis (check core.E002).
+COUNTER_WRITE_BEHIND = os.environ.get("COUNTER_WRITE_BEHIND", "false").lower() == "true"
+COUNTER_FLUSH_INTERVAL_MS = int(os.environ.get("COUNTER_FLUSH_INTERVAL_MS", 500))
+# Deltas still pending after this many seconds were left by a worker that died before flushing them; the
+# flush_pending_counters and reconcile_counters commands repair those posts.
+COUNTER_PENDING_MAX_AGE = int(os.environ.get("COUNTER_PENDING_MAX_AGE", 300))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Response and count caches rely on versions shared by every worker, so production should point this at a
+# shared backend (e.g. FileBasedCache on a shared volume or Redis); the default is per process.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
     }
 }
 
@@ -140,6 +202,19 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "core.User"
 
+AUTHENTICATION_BACKENDS = ["core.authentication.PooledHashingModelBackend"]
+
+# Password hashing runs in a bounded pool (see core.hashing); requests beyond workers + queue get a 503. The limits
+# are per process and every waiting request holds a gunicorn thread, so they only shed load while workers + queue
+# stays below GUNICORN_THREADS; the default keeps one thread of each worker free for other requests.
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get(
+        "PASSWORD_HASHING_WORKERS",
+        max(int(os.environ.get("GUNICORN_THREADS", 2)) - 1, 1),
+    )
+)
+PASSWORD_HASHING_QUEUE = int(os.environ.get("PASSWORD_HASHING_QUEUE", 0))
+
 """
  Djangorestframework-simplejwt Config.
     check https://django-rest-framework-simplejwt.readthedocs.io/en/latest/settings.html for more details.
@@ -154,8 +229,15 @@ SIMPLE_JWT = {
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
-    ],
+    "DEFAULT_AUTHENTICATION_CLASSES": ["core.authentication.CachedJWTAuthentication"],
     "DEFAULT_PAGINATION_CLASS": "core.pagination.CustomPagination",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
@@ -19,6 +19,8 @@ from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from core.view import DatabasePoolStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
@@ -27,8 +29,14 @@ urlpatterns = [
         SpectacularSwaggerView.as_view(url_name="api-schema"),
         name="api-docs",
     ),
+    path(
+        "api/metrics/db-pool/",
+        DatabasePoolStatsView.as_view(),
+        name="metrics-db-pool",
+    ),
     path("api/", include("user.urls")),
     path("api/", include("post.urls")),
     path("api/", include("like.urls")),
     path("api/", include("comment.urls")),
+    path("api/", include("feed.urls")),
 ]
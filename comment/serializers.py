@@ -1,10 +1,16 @@
 from rest_framework import serializers
 
 from core import models
+from core.serializers import SparseFieldsetMixin
 
 
-class CommentModelSerializer(serializers.ModelSerializer):
+class CommentModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Comment
         fields = ["id", "user", "post"]
-        read_only_fields = ["id"]
+        read_only_fields = ["id", "user"]
+
+
+class CommentBulkSerializer(serializers.Serializer):
+    post = serializers.IntegerField(min_value=1)
+    content = serializers.CharField()
@@ -1,3 +1,6 @@
+import json
+
+from asgiref.sync import async_to_sync
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -5,6 +8,7 @@ from rest_framework.test import APIClient
 
 from core import models
 from core.tests import helpers
+from user.serializers import CustomTokenObtainPairSerializer
 
 BASE_LIKE_URL = reverse("comment:comment-list")
 
@@ -102,3 +106,108 @@ class PrivateCommentApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["count"], 1)
         self.assertEqual(res.data["results"][0]["post"], self.post.id)
+
+    def _add_comments_by_new_users(self, size):
+        for index in range(size):
+            user = helpers.create_user(email=f"commentr{size}-{index}@example.com")
+            helpers.create_comment(self.post, "test", user)
+
+    def test_list_comments_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(BASE_LIKE_URL, {"page_size": size}),
+            self._add_comments_by_new_users,
+        )
+
+    def test_list_comments_by_post_id_query_budget(self):
+        url = comment_list_by_post_id_url(self.post.id)
+
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(url, {"page_size": size}),
+            self._add_comments_by_new_users,
+        )
+
+    def test_retrieve_comment_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(detail_url(self.comment.id)),
+            self._add_comments_by_new_users,
+        )
+
+    def test_retrieve_comments_by_post_id_not_modified(self):
+        url = comment_list_by_post_id_url(self.post.id)
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        helpers.create_comment(self.post, "new", self.user)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+
+    def test_bulk_create_comments(self):
+        payload = [
+            {"post": self.post.id, "content": "first"},
+            {"post": self.post.id, "content": "second"},
+        ]
+
+        res = self.client.post(reverse("comment:comment-bulk"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data, {"created": 2})
+        self.assertTrue(models.Comment.objects.filter(content="second").exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+
+    def test_bulk_create_comments_invalidates_listing(self):
+        url = comment_list_by_post_id_url(self.post.id)
+        self.client.get(url)
+
+        self.client.post(
+            reverse("comment:comment-bulk"),
+            [{"post": self.post.id, "content": "new"}],
+            format="json",
+        )
+        res = self.client.get(url)
+
+        self.assertEqual(res.data["count"], 2)
+
+    def test_stream_comments_by_post_id(self):
+        url = comment_list_by_post_id_url(self.post.id)
+
+        res = self.client.get(url, {"stream": "true"})
+
+        body = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(body["count"], 1)
+        self.assertEqual(body["results"][0]["id"], self.comment.id)
+
+    def test_export_comments_by_post_id(self):
+        url = reverse(
+            "comment:comment-export-by-post", kwargs={"post_id": self.post.id}
+        )
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [self.comment.id])
+
+    def test_async_retrieve_comments_by_post_id_matches_sync(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        url = reverse(
+            "comment:async-comment-list-by-post", kwargs={"post_id": self.post.id}
+        )
+
+        res = async_to_sync(self.async_client.get)(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 1)
+        self.assertEqual(
+            res.json(),
+            self.client.get(comment_list_by_post_id_url(self.post.id)).json(),
+        )
@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from comment import views
@@ -7,4 +8,10 @@ app_name = "comment"
 router = SimpleRouter()
 router.register(r"comment", views.CommentModelViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/comment/posts/<int:post_id>/",
+        views.async_comments_by_post_id,
+        name="async-comment-list-by-post",
+    ),
+]
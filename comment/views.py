@@ -1,19 +1,31 @@
 from rest_framework import filters
 from rest_framework.decorators import action
-from rest_framework.response import Response
 
-from core import models
-from core.view import BaseModelViewSet
+from core import async_views, caching, counting, models
+from core.view import BaseModelViewSet, BulkCreateMixin
 from comment import serializers
 
 
-class CommentModelViewSet(BaseModelViewSet):
+class CommentModelViewSet(BulkCreateMixin, BaseModelViewSet):
     queryset = models.Comment.objects.all().order_by("-id")
     serializer_class = serializers.CommentModelSerializer
+    bulk_serializer_class = serializers.CommentBulkSerializer
+    bulk_counter_field = "comment_count"
     http_method_names = ["get", "post", "delete"]
+    fast_list_serializer = True
     filter_backends = [filters.SearchFilter]
     search_fields = ["=post__id"]
 
+    def get_count_strategy(self):
+        if self.action == "get_comments_by_post_id":
+            return counting.DenormalizedCount("comment_count", self.kwargs["post_id"])
+        return super().get_count_strategy()
+
+    def get_conditional_version_key(self):
+        if self.action == "get_comments_by_post_id":
+            return caching.object_key(models.Post, self.kwargs["post_id"])
+        return super().get_conditional_version_key()
+
     @action(
         detail=False,
         methods=["get"],
@@ -22,11 +34,29 @@ class CommentModelViewSet(BaseModelViewSet):
     )
     def get_comments_by_post_id(self, request, post_id: int):
         queryset = self.get_queryset().filter(post_id=post_id)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        return self.get_list_response(queryset)
 
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="posts/(?P<post_id>[^/.]+)/export",
+        url_name="export-by-post",
+    )
+    def export_comments_by_post_id(self, request, post_id: int):
+        queryset = self.get_queryset().filter(post_id=post_id)
+
+        return self.get_export_response(queryset, f"comments-post-{post_id}.ndjson")
+
+
+@async_views.async_api_view
+async def async_comments_by_post_id(request, post_id: int):
+    queryset = models.Comment.objects.filter(post_id=post_id).order_by("-id")
+    return async_views.json_response(
+        await async_views.paginate(
+            request,
+            queryset,
+            serializers.CommentModelSerializer,
+            counting.DenormalizedCount("comment_count", post_id),
+        )
+    )
@@ -1,6 +1,68 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save, pre_delete
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from core import caching, counters, counting, feed, models, search
+        from core import checks  # noqa: F401 (registers the system checks)
+
+        post_save.connect(
+            search.index_post, sender=models.Post, dispatch_uid="index_post"
+        )
+        post_save.connect(
+            feed.fan_out_post, sender=models.Post, dispatch_uid="fan_out_post"
+        )
+        post_save.connect(
+            feed.follow_created, sender=models.Follow, dispatch_uid="follow_created"
+        )
+        post_delete.connect(
+            feed.follow_deleted, sender=models.Follow, dispatch_uid="follow_deleted"
+        )
+
+        pre_delete.connect(
+            counters.collect_deleted,
+            sender=models.Post,
+            dispatch_uid="collect_deleted_Post",
+        )
+        for model in (models.Like, models.Comment):
+            post_save.connect(
+                counters.count_created,
+                sender=model,
+                dispatch_uid=f"count_created_{model.__name__}",
+            )
+            pre_delete.connect(
+                counters.collect_deleted,
+                sender=model,
+                dispatch_uid=f"collect_deleted_{model.__name__}",
+            )
+            post_delete.connect(
+                counters.count_deleted,
+                sender=model,
+                dispatch_uid=f"count_deleted_{model.__name__}",
+            )
+
+        for model in (models.Post, models.Like, models.Comment, models.Follow):
+            post_save.connect(
+                counting.invalidate_counts,
+                sender=model,
+                dispatch_uid=f"invalidate_counts_{model.__name__}",
+            )
+            post_delete.connect(
+                counting.invalidate_counts,
+                sender=model,
+                dispatch_uid=f"invalidate_counts_delete_{model.__name__}",
+            )
+            post_save.connect(
+                caching.invalidate_versions,
+                sender=model,
+                dispatch_uid=f"invalidate_versions_{model.__name__}",
+            )
+            post_delete.connect(
+                caching.invalidate_versions,
+                sender=model,
+                dispatch_uid=f"invalidate_versions_delete_{model.__name__}",
+            )
@@ -0,0 +1,118 @@
+"""
+Helpers for the async read endpoints served under ``/api/async/``.
+
+DRF views are sync only, so the hot read paths also exist as plain Django async views built on the async ORM.
+They reuse the JWT authentication (reads never touch the database, see ``core.authentication``), the compiled
+row serializers and the response envelope of ``CustomPagination``.
+"""
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+
+from core.authentication import CachedJWTAuthentication
+from core.pagination import CustomPagination
+from core.renderers import FastJSONRenderer
+from core.serializers import FastListSerializer
+
+
+def json_response(data, status_code=status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(
+        FastJSONRenderer().render(data),
+        status=status_code,
+        content_type="application/json",
+    )
+
+
+def async_api_view(view):
+    """
+    Wrap an async view with the API's authentication and error responses.
+
+    Only ``GET``/``HEAD`` are allowed. ``APIException``s raised by the view are rendered like DRF does.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            if request.method not in ("GET", "HEAD"):
+                raise exceptions.MethodNotAllowed(request.method)
+
+            auth = CachedJWTAuthentication().authenticate(request)
+            if auth is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = auth
+
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            data = exc.detail
+            if not isinstance(data, (list, dict)):
+                data = {"detail": data}
+            return json_response(data, exc.status_code)
+
+    return wrapper
+
+
+def get_int_param(request, name: str, default: int) -> int:
+    try:
+        value = int(request.GET.get(name, default))
+    except ValueError:
+        raise exceptions.NotFound("Invalid page.")
+    if value < 1:
+        raise exceptions.NotFound("Invalid page.")
+    return value
+
+
+async def paginate(request, queryset, serializer_class, count_strategy) -> dict:
+    """
+    Build the ``CustomPagination`` envelope for ``queryset`` with the async ORM.
+
+    :param request: The current request, read for ``page`` and ``page_size``
+    :param queryset: An ordered queryset
+    :param serializer_class: The ModelSerializer whose output the rows must match
+    :param count_strategy: A strategy from ``core.counting``
+    :return: The ``next/previous/count/results`` dict
+    """
+    page_size = min(
+        get_int_param(request, "page_size", CustomPagination.page_size),
+        CustomPagination.max_page_size,
+    )
+    page = get_int_param(request, "page", 1)
+
+    serializer = FastListSerializer.for_serializer(serializer_class)
+    start, end = (page - 1) * page_size, page * page_size + 1
+    rows = [
+        row
+        async for row in queryset.values_list(*serializer.paths, named=True)[start:end]
+    ]
+    if not rows and page > 1:
+        raise exceptions.NotFound("Invalid page.")
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    # The strategy may estimate, so it only fills ``count``; the rows decide the pages.
+    if has_next:
+        count = await sync_to_async(count_strategy.count)(queryset)
+        count = max(count, start + len(rows) + 1)
+    else:
+        count = start + len(rows)
+
+    return {
+        "next": page + 1 if has_next else None,
+        "previous": page - 1 if page > 1 else None,
+        "count": count,
+        "results": serializer.serialize(rows),
+    }
+
+
+async def detail(queryset, pk, serializer_class) -> dict:
+    serializer = FastListSerializer.for_serializer(serializer_class)
+    row = await (
+        queryset.filter(pk=pk).values_list(*serializer.paths, named=True).afirst()
+    )
+    if row is None:
+        raise exceptions.NotFound(
+            f"No {queryset.model._meta.object_name} matches the given query."
+        )
+    return serializer.serialize([row])[0]
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+from django.utils.functional import cached_property
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from core import hashing
+
+VERIFIED_TOKEN_CACHE_SIZE = 4096
+
+
+class ClaimsUser(TokenUser):
+    """
+    User built from the claims ``CustomTokenObtainPairSerializer.get_token`` embeds, without a database query.
+
+    It behaves like a read-only ``User``: ``save``/``delete`` raise, and the profile fields are the ones the token
+    was issued with.
+    """
+
+    @cached_property
+    def username(self) -> str:
+        return self.token.get("user_username", "")
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get("user_email", "")
+
+    @cached_property
+    def name(self) -> str:
+        return self.token.get("user_name", "")
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature and claims were already verified, keyed by the raw token.
+
+    Entries are dropped when the token expires, so a cached token is never accepted past its ``exp`` claim.
+    """
+
+    def __init__(self, maxsize: int = VERIFIED_TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token: bytes):
+        with self._lock:
+            token = self._tokens.get(raw_token)
+            if token is not None and token.get("exp", 0) <= time.time():
+                del self._tokens[raw_token]
+                token = None
+
+            if token is None:
+                self.misses += 1
+                return None
+
+            self._tokens.move_to_end(raw_token)
+            self.hits += 1
+            return token
+
+    def set(self, raw_token: bytes, token):
+        with self._lock:
+            self._tokens[raw_token] = token
+            self._tokens.move_to_end(raw_token)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._tokens),
+            "maxsize": self.maxsize,
+        }
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that only reads the ``User`` row when a request can write.
+
+    Safe-method requests get a ``ClaimsUser`` built from the token claims; other methods load the full user as
+    ``JWTAuthentication`` does. Verified tokens are kept in ``verified_tokens`` so repeated requests with the same
+    token skip signature verification.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if request.method in permissions.SAFE_METHODS:
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_validated_token(self, raw_token: bytes):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.set(raw_token, token)
+        return token
+
+
+class PooledHashingModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` that verifies passwords in the bounded hashing pool of ``core.hashing``.
+
+    Only the hash runs in the pool; the user lookup and the rehash on a hasher upgrade stay on the request thread
+    and its database connection.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway so unknown and known users take the same time.
+            hashing.run(user_model().set_password, password)
+            return None
+
+        outdated = []
+        if not hashing.run(check_password, password, user.password, outdated.append):
+            return None
+        if outdated:
+            hashing.run(user.set_password, password)
+            user.save(update_fields=["password"])
+        return user if self.user_can_authenticate(user) else None
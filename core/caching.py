@@ -0,0 +1,145 @@
+"""
+Version numbers and the read-through response cache built on top of them.
+
+Instead of deleting cached entries, every cached value embeds the version of what it was built from. Writers
+only bump the version, which makes the old entries unreachable; they expire on their own. Versions start from
+the current time in milliseconds so a version evicted from the cache never restarts at a value that is still
+embedded in live keys.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from core import routers
+
+RESPONSE_CACHE_PREFIX = "response"
+RESPONSE_CACHE_TIMEOUT = 60
+
+
+def get_version(key: str) -> int:
+    return cache.get_or_set(f"version:{key}", _initial_version, None)
+
+
+def get_version_info(key: str) -> tuple:
+    """
+    Return the version of ``key`` together with the timestamp of its last bump.
+
+    When the timestamp is unknown (first read or evicted) it is recorded as now, which is never earlier than the
+    real last change.
+    """
+    values = cache.get_many([f"version:{key}", f"modified:{key}"])
+    version = values.get(f"version:{key}")
+    if version is None:
+        version = get_version(key)
+    modified = values.get(f"modified:{key}")
+    if modified is None:
+        modified = time.time()
+        cache.add(f"modified:{key}", modified, None)
+    return version, modified
+
+
+def bump_version(key: str):
+    full_key = f"version:{key}"
+    try:
+        cache.incr(full_key)
+    except ValueError:
+        cache.set(full_key, _initial_version(), None)
+    cache.set(f"modified:{key}", time.time(), None)
+
+
+def _initial_version() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def collection_key(model) -> str:
+    return f"{model._meta.label_lower}:collection"
+
+
+def object_key(model, pk) -> str:
+    return f"{model._meta.label_lower}:{pk}"
+
+
+def invalidate_versions(sender, instance, **kwargs):
+    """
+    Signal receiver bumping the versions cached responses and ETags depend on.
+
+    Connected to ``post_save``/``post_delete`` of ``Post``, ``Like``, ``Comment`` and ``Follow``. Besides the row
+    and the collection of ``sender`` itself, likes and comments bump their post, since they change the counters
+    shown in the post detail, in every post list page and in the post's ``list-by-post`` listings.
+    """
+    bump_version(object_key(sender, instance.pk))
+    bump_version(collection_key(sender))
+
+    post_id = getattr(instance, "post_id", None)
+    if post_id is not None:
+        invalidate_posts([post_id])
+
+
+def invalidate_posts(post_ids):
+    """Bump the versions of the given posts and of the post collection, for writes that bypass the signals."""
+    from core import models
+
+    for post_id in post_ids:
+        bump_version(object_key(models.Post, post_id))
+    bump_version(collection_key(models.Post))
+
+
+class VersionedResponseCacheMixin:
+    """
+    Read-through cache for ``list`` and ``retrieve``, keyed by path and query parameters, and by user when the view
+    sets ``vary_on_user``.
+
+    List responses embed the collection version of the viewset's model, detail responses the version of the
+    object, so the receivers bumping those versions are all the invalidation needed. A response built right after a
+    bump reads from the primary, a lagging replica would cache the previous data under the new version.
+    """
+
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        return self._cached_response(
+            collection_key(model),
+            lambda: super(VersionedResponseCacheMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self._cached_response(
+            object_key(model, lookup),
+            lambda: super(VersionedResponseCacheMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+    def get_response_cache_key(self, version: int) -> str:
+        params = sorted(self.request.query_params.lists())
+        viewer = self.request.user.pk if getattr(self, "vary_on_user", False) else ""
+        signature = hashlib.md5(
+            f"{self.request.path}?{params}:{viewer}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"{RESPONSE_CACHE_PREFIX}:{version}:{signature}"
+
+    def _cached_response(self, version_key: str, build):
+        version, modified = get_version_info(version_key)
+        key = self.get_response_cache_key(version)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        if routers.is_recent(modified):
+            routers.use_primary(self.request)
+
+        response = build()
+        if response.status_code == status.HTTP_200_OK and isinstance(
+            response, Response
+        ):
+            cache.set(key, response.data, self.response_cache_timeout)
+        return response
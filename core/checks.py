@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core import checks
+
+# Backends whose entries are only visible to the process that wrote them.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+# Backends whose ``incr``/``decr`` read the value and write it back, losing concurrent updates.
+NON_ATOMIC_INCR_CACHES = {
+    "django.core.cache.backends.db.DatabaseCache",
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+
+@checks.register(checks.Tags.caches)
+def check_replica_cache(app_configs, **kwargs):
+    """
+    Read replicas need a cache shared by every server process.
+
+    The primary pins of ``core.routers`` and the versions deciding whether a response may be read from a replica
+    are kept in the cache; with a per-process cache a write served by one worker is unknown to the others.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.REPLICA_DATABASES and backend in PROCESS_LOCAL_CACHES:
+        return [
+            checks.Error(
+                "Read replicas require a cache shared between processes.",
+                hint="Set CACHE_BACKEND, e.g. to a memcached or Redis backend.",
+                obj=backend,
+                id="core.E001",
+            )
+        ]
+    return []
+
+
+@checks.register(checks.Tags.caches)
+def check_write_behind_cache(app_configs, **kwargs):
+    """
+    Write-behind counters need a cache with atomic increments.
+
+    Deltas are added and taken off the buffer with ``incr``/``decr`` by every process at once; a read-then-write
+    increment drops some of them, or lets two flushers write the same one.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.COUNTER_WRITE_BEHIND and backend in NON_ATOMIC_INCR_CACHES:
+        return [
+            checks.Error(
+                "COUNTER_WRITE_BEHIND requires a cache with atomic increments.",
+                hint="Set CACHE_BACKEND to a memcached or Redis backend, or disable COUNTER_WRITE_BEHIND.",
+                obj=backend,
+                id="core.E002",
+            )
+        ]
+    return []
@@ -0,0 +1,449 @@
+"""
+Denormalized post counters: ``Post.like_count`` and ``Post.comment_count``.
+
+Counters change with ``UPDATE ... SET like_count = like_count + n`` statements, never by saving a loaded ``Post``,
+so concurrent writers cannot overwrite each other's increments. Creating a like or comment adds one. Deletes,
+including ``QuerySet.delete()`` and cascades, are counted from the deletion signals: ``pre_delete`` is sent for every
+collected row before anything is deleted, so the rows are buffered there and the first ``post_delete`` applies them
+with one ``UPDATE`` per distinct decrement, inside the delete's transaction. Posts deleted by the same call are left
+out.
+
+With ``COUNTER_WRITE_BEHIND`` the deltas of committed writes are buffered in the cache instead (``WriteBehindBuffer``)
+and a flusher thread per process writes them every ``COUNTER_FLUSH_INTERVAL_MS``, so a viral post sees one
+``UPDATE`` per interval instead of one per like, all serialized on its row lock. Reads add the unflushed deltas with
+``merge_pending``. A worker killed before its flush leaves its deltas in the cache: the ``flush_pending_counters``
+command writes the leftovers, and ``reconcile_range`` repairs posts whose deltas stayed pending longer than
+``COUNTER_PENDING_MAX_AGE``. Flushers of different processes can hold the same posts, so each post is flushed
+under a cache lock, and the cache must increment atomically (check ``core.E002``).
+
+``reconcile_range`` recomputes the counters from ``Like``/``Comment`` for a range of post ids. Drifted posts are
+found with one read of correlated ``COUNT`` subqueries (each a range scan of the ``post_id`` index), then only those
+rows are updated, with the same subqueries as new values so the write never stores a count read earlier.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from core import caching, models, trending
+
+# Counter field of ``Post`` and the reverse relation it counts.
+COUNTERS = {"like_count": "likes", "comment_count": "comments"}
+
+# Seconds a flush lock outlives a flusher that died holding it.
+FLUSH_LOCK_TIMEOUT = 60
+
+_local = threading.local()
+
+logger = logging.getLogger(__name__)
+
+
+def get_counter_field(model) -> str:
+    """The ``Post`` counter counting the rows of ``model``."""
+    for field, related_name in COUNTERS.items():
+        if models.Post._meta.get_field(related_name).related_model is model:
+            return field
+    raise LookupError(f"No post counter counts {model._meta.label}.")
+
+
+def adjust(field: str, deltas: dict):
+    """
+    Add ``deltas`` (post id to change) to the counter ``field`` and to the trending scores.
+
+    With ``COUNTER_WRITE_BEHIND`` they are buffered once the current transaction commits, otherwise written now.
+    """
+    if settings.COUNTER_WRITE_BEHIND:
+        deltas = dict(deltas)
+        transaction.on_commit(lambda: write_behind.add(field, deltas))
+        return
+    write(field, deltas)
+
+
+def write(field: str, deltas: dict):
+    """Posts sharing a delta are updated together, so a batch costs one ``UPDATE`` per distinct delta."""
+    by_delta = defaultdict(list)
+    for post_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(post_id)
+
+    for delta, post_ids in by_delta.items():
+        models.Post.objects.filter(pk__in=post_ids).update(**{field: F(field) + delta})
+    trending.record(
+        {post_id: delta * trending.WEIGHTS[field] for post_id, delta in deltas.items()}
+    )
+
+
+def pending_key(field: str, post_id, sign: str) -> str:
+    return f"counter-pending:{field}:{post_id}:{sign}"
+
+
+def pending_since_key(post_id) -> str:
+    return f"counter-pending-since:{post_id}"
+
+
+def flush_lock_key(post_id) -> str:
+    return f"counter-flush-lock:{post_id}"
+
+
+def incr(key: str, delta: int):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+class WriteBehindBuffer:
+    """
+    Counter deltas waiting in the cache to be written to ``Post``.
+
+    Increments and decrements are kept in separate cache counters since memcached cannot go below zero. A flush
+    takes the amounts it read off the cache counters before writing them and puts them back if the write fails, so
+    deltas added meanwhile are never lost. The cache cannot list its keys, so each process flushes the posts it
+    buffered deltas for; with a shared cache that flush also writes the deltas other processes added to them, so a
+    post is only taken under its flush lock: two flushers reading the same amount would otherwise both write it. The
+    time a post first got pending deltas is kept too, so deltas a dead process never flushed can be told apart.
+    """
+
+    def __init__(self):
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def add(self, field: str, deltas: dict):
+        now = time.time()
+        for post_id, delta in deltas.items():
+            if delta:
+                incr(pending_key(field, post_id, "+" if delta > 0 else "-"), abs(delta))
+                cache.add(pending_since_key(post_id), now, None)
+        with self._lock:
+            self._dirty.update(post_id for post_id, delta in deltas.items() if delta)
+        self.start_flusher()
+
+    @staticmethod
+    def get_keys(post_ids) -> dict:
+        return {
+            pending_key(field, post_id, sign): (post_id, field, sign)
+            for post_id in post_ids
+            for field in COUNTERS
+            for sign in "+-"
+        }
+
+    def get_pending(self, post_ids) -> dict:
+        """Unflushed deltas of ``post_ids`` as ``{post_id: {field: delta}}``, for the posts that have some."""
+        keys = self.get_keys(post_ids)
+        pending = defaultdict(Counter)
+        for key, value in cache.get_many(list(keys)).items():
+            post_id, field, sign = keys[key]
+            pending[post_id][field] += value if sign == "+" else -value
+        return {
+            post_id: dict(fields)
+            for post_id, fields in pending.items()
+            if any(fields.values())
+        }
+
+    def get_pending_since(self, post_ids) -> dict:
+        """
+        When the pending deltas of ``post_ids`` were first added, as timestamps.
+
+        Posts whose time is unknown (evicted, or added before it was kept) are recorded as pending from now.
+        """
+        keys = {pending_since_key(post_id): post_id for post_id in post_ids}
+        since = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+        now = time.time()
+        for post_id in set(post_ids) - set(since):
+            cache.add(pending_since_key(post_id), now, None)
+            since[post_id] = now
+        return since
+
+    @staticmethod
+    def lock(post_ids) -> list:
+        """
+        Take the flush locks of ``post_ids``.
+
+        :return: The posts locked, the others are being flushed by another process
+        """
+        return [
+            post_id
+            for post_id in post_ids
+            if cache.add(flush_lock_key(post_id), os.getpid(), FLUSH_LOCK_TIMEOUT)
+        ]
+
+    @staticmethod
+    def unlock(post_ids):
+        cache.delete_many([flush_lock_key(post_id) for post_id in post_ids])
+
+    def take(self, post_ids) -> dict:
+        """
+        Take the pending deltas of ``post_ids``, which must be locked, off the cache counters.
+
+        :return: The amounts taken, by cache key; ``restore`` puts them back
+        """
+        keys = self.get_keys(post_ids)
+        taken = {}
+        for key, value in cache.get_many(list(keys)).items():
+            if not value:
+                continue
+            try:
+                cache.decr(key, value)
+            except ValueError:
+                # Evicted since it was read.
+                continue
+            taken[key] = value
+        return taken
+
+    @staticmethod
+    def restore(taken: dict):
+        for key, value in taken.items():
+            incr(key, value)
+
+    def clear_since(self, post_ids):
+        """Forget when the posts of ``post_ids`` that have no pending deltas left got them."""
+        settled = set(post_ids) - set(self.get_pending(post_ids))
+        cache.delete_many([pending_since_key(post_id) for post_id in settled])
+
+    def flush(self, post_ids=None) -> list:
+        """
+        Write the pending deltas, one ``UPDATE`` per field and distinct delta.
+
+        :param post_ids: The posts to flush, by default the ones this process buffered deltas for
+        :return: The ids of the posts whose counters changed
+        """
+        if post_ids is None:
+            with self._lock:
+                post_ids, self._dirty = self._dirty, set()
+        if not post_ids:
+            return []
+
+        locked = self.lock(post_ids)
+        # The deltas of busy posts are written by their current flush, or by a later one of this process.
+        busy = set(post_ids) - set(locked)
+        if busy:
+            with self._lock:
+                self._dirty.update(busy)
+
+        keys = self.get_keys(locked)
+        try:
+            taken = self.take(locked)
+            deltas = defaultdict(Counter)
+            for key, value in taken.items():
+                post_id, field, sign = keys[key]
+                deltas[field][post_id] += value if sign == "+" else -value
+
+            try:
+                with transaction.atomic():
+                    for field, field_deltas in deltas.items():
+                        write(field, field_deltas)
+            except Exception:
+                self.restore(taken)
+                with self._lock:
+                    self._dirty.update(locked)
+                raise
+
+            self.clear_since({keys[key][0] for key in taken})
+        finally:
+            self.unlock(locked)
+        written = sorted(
+            {
+                post_id
+                for field_deltas in deltas.values()
+                for post_id, delta in field_deltas.items()
+                if delta
+            }
+        )
+        # Cached responses embed the counters they were built with, only unflushed deltas are merged on read.
+        caching.invalidate_posts(written)
+        return written
+
+    def start_flusher(self):
+        """Start the flusher thread of this process, threads do not survive the fork of a preloading server."""
+        if not settings.COUNTER_FLUSH_INTERVAL_MS:
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self.run_flusher,
+                args=(settings.COUNTER_FLUSH_INTERVAL_MS / 1000,),
+                name="counter-flusher",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def run_flusher(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing buffered post counters failed")
+            finally:
+                close_old_connections()
+
+
+write_behind = WriteBehindBuffer()
+
+
+def get_pending(post_ids) -> dict:
+    """``WriteBehindBuffer.get_pending``, empty when write-behind is disabled."""
+    if not settings.COUNTER_WRITE_BEHIND:
+        return {}
+    return write_behind.get_pending(post_ids)
+
+
+def get_stranded(post_ids) -> list:
+    """The posts of ``post_ids`` whose deltas have been pending longer than ``COUNTER_PENDING_MAX_AGE``."""
+    pending = write_behind.get_pending(post_ids)
+    stranded_before = time.time() - settings.COUNTER_PENDING_MAX_AGE
+    return [
+        post_id
+        for post_id, since in write_behind.get_pending_since(pending).items()
+        if since < stranded_before
+    ]
+
+
+def flush_stranded(low: int, high: int) -> list:
+    """
+    Flush the stranded deltas (see ``get_stranded``) of the posts with ``low <= id < high``.
+
+    Newer deltas are left to the flusher of the process that buffered them.
+
+    :return: The ids of the posts whose counters changed
+    """
+    post_ids = models.Post.objects.filter(pk__gte=low, pk__lt=high).values_list(
+        "pk", flat=True
+    )
+    return write_behind.flush(get_stranded(post_ids))
+
+
+def merge_pending(items):
+    """Add the unflushed deltas to the counters of serialized posts, the ones rendered without ``id`` are skipped."""
+    posts = {item["id"]: item for item in items if "id" in item}
+    for post_id, fields in get_pending(posts).items():
+        for field, delta in fields.items():
+            if field in posts[post_id]:
+                posts[post_id][field] += delta
+
+
+def sync_cached_post(instance, field: str, delta: int):
+    """Apply ``delta`` to the post loaded on ``instance``, if any, as the database was."""
+    if type(instance).post.is_cached(instance):
+        setattr(instance.post, field, getattr(instance.post, field) + delta)
+
+
+def count_created(sender, instance, created=False, raw=False, **kwargs):
+    """Signal receiver counting a new like or comment on its post."""
+    if not created or raw:
+        return
+    field = get_counter_field(sender)
+    adjust(field, {instance.post_id: 1})
+    sync_cached_post(instance, field, 1)
+
+
+class PendingDeletes:
+    """Rows collected by one ``delete()`` call, keyed by ``(model, pk)`` so a retried delete is not counted twice."""
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.rows = {}
+        self.post_ids = set()
+
+    def get_deltas(self) -> dict:
+        deltas = defaultdict(Counter)
+        for (model, _), post_id in self.rows.items():
+            if post_id not in self.post_ids:
+                deltas[get_counter_field(model)][post_id] -= 1
+        return deltas
+
+
+def collect_deleted(sender, instance, origin=None, **kwargs):
+    """``pre_delete`` receiver buffering the likes, comments and posts a delete is about to remove."""
+    pending = getattr(_local, "pending", None)
+    if pending is None or pending.origin is not origin:
+        pending = _local.pending = PendingDeletes(origin)
+
+    if sender is models.Post:
+        pending.post_ids.add(instance.pk)
+    else:
+        pending.rows[sender, instance.pk] = instance.post_id
+
+
+def count_deleted(sender, instance, origin=None, **kwargs):
+    """``post_delete`` receiver uncounting the buffered likes and comments, on the first row of a delete."""
+    pending = getattr(_local, "pending", None)
+    if pending is not None and pending.origin is origin:
+        _local.pending = None
+        for field, deltas in pending.get_deltas().items():
+            adjust(field, deltas)
+    sync_cached_post(instance, get_counter_field(sender), -1)
+
+
+def actual_count(related_name: str):
+    """Expression counting the rows of ``related_name`` pointing to the outer post."""
+    model = models.Post._meta.get_field(related_name).related_model
+    totals = (
+        model.objects.filter(post_id=OuterRef("pk"))
+        .order_by()
+        .values("post_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(totals), 0)
+
+
+def iter_ranges(start: int, stop: int, size: int):
+    """Yield ``(low, high)`` bounds covering ``start <= id < stop`` in steps of ``size``."""
+    for low in range(start, stop, size):
+        yield low, min(low + size, stop)
+
+
+def reconcile_range(low: int, high: int) -> list:
+    """
+    Fix the counters of the posts with ``low <= id < high`` that disagree with their likes and comments.
+
+    :return: The ids of the posts that were fixed
+    """
+    actual = {field: actual_count(related) for field, related in COUNTERS.items()}
+    drifted = Q()
+    for field, expression in actual.items():
+        drifted |= ~Q(**{field: expression})
+
+    post_ids = list(
+        models.Post.objects.filter(pk__gte=low, pk__lt=high)
+        .filter(drifted)
+        .values_list("pk", flat=True)
+    )
+    # Posts with unflushed write-behind deltas only look drifted and are checked on a later run, unless the deltas
+    # are stranded: the recomputed counters already count the rows they were for.
+    pending = write_behind.get_pending(post_ids)
+    stranded = write_behind.lock(get_stranded(pending))
+    post_ids = [
+        post_id for post_id in post_ids if post_id not in pending or post_id in stranded
+    ]
+    try:
+        if post_ids:
+            taken = write_behind.take(stranded)
+            try:
+                with transaction.atomic():
+                    models.Post.objects.filter(pk__in=post_ids).update(**actual)
+            except Exception:
+                write_behind.restore(taken)
+                raise
+            write_behind.clear_since(stranded)
+            caching.invalidate_posts(post_ids)
+    finally:
+        write_behind.unlock(stranded)
+    return post_ids
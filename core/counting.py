@@ -0,0 +1,131 @@
+"""
+Count strategies used by ``core.pagination.CustomPagination``.
+
+A viewset picks one through ``get_count_strategy``; the paginator then asks it for the displayed total instead of
+always running ``COUNT(*)`` over the filtered queryset. Page navigation never depends on it, so a strategy may
+estimate.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from core import caching, counters, models
+
+COUNT_CACHE_PREFIX = "count"
+COUNT_CACHE_TIMEOUT = 300
+
+
+class ExactCount:
+    """Plain ``COUNT(*)``, the behaviour Django's paginator has by default."""
+
+    def count(self, queryset) -> int:
+        return queryset.count()
+
+
+class CachedCount(ExactCount):
+    """
+    Exact count cached per model and per filter signature (the compiled SQL of the queryset).
+
+    Every model has a version number that is bumped when one of its rows is created or deleted, see
+    ``invalidate_counts``, so a cached total never outlives a change in the number of rows. Updates that move a row
+    in or out of a filter are only picked up after ``COUNT_CACHE_TIMEOUT``.
+    """
+
+    timeout = COUNT_CACHE_TIMEOUT
+
+    def count(self, queryset) -> int:
+        try:
+            key = self.get_cache_key(queryset)
+        except EmptyResultSet:
+            return 0
+
+        total = cache.get(key)
+        if total is None:
+            total = super().count(queryset)
+            cache.set(key, total, self.timeout)
+        return total
+
+    def get_cache_key(self, queryset) -> str:
+        label = queryset.model._meta.label_lower
+        signature = hashlib.md5(
+            f"{queryset.db}:{queryset.query}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"{COUNT_CACHE_PREFIX}:{label}:{get_count_version(label)}:{signature}"
+
+
+class EstimatedCount:
+    """
+    Row estimate taken from the table statistics, only used for unfiltered querysets.
+
+    MySQL keeps ``information_schema.TABLES.TABLE_ROWS`` up to date from InnoDB statistics, which is good enough to
+    render "about N results" and costs a single metadata lookup. Filtered querysets and backends without statistics
+    use ``fallback`` instead.
+    """
+
+    def __init__(self, fallback=None):
+        self.fallback = fallback or CachedCount()
+
+    def count(self, queryset) -> int:
+        if not queryset.query.where:
+            estimate = self.get_estimate(queryset)
+            if estimate is not None:
+                return estimate
+        return self.fallback.count(queryset)
+
+    def get_estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "mysql":
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        if row is None or row[0] is None:
+            return None
+        return int(row[0])
+
+
+class DenormalizedCount:
+    """
+    Reads a counter kept on ``Post`` (``like_count``/``comment_count``) instead of counting the related rows.
+
+    Only valid for querysets that are restricted to a single post and not otherwise filtered, like the
+    ``list-by-post`` actions.
+    """
+
+    def __init__(self, field: str, post_id):
+        self.field = field
+        self.post_id = post_id
+
+    def count(self, queryset) -> int:
+        total = (
+            models.Post.objects.filter(pk=self.post_id)
+            .values_list(self.field, flat=True)
+            .first()
+        )
+        pending = counters.get_pending([self.post_id]).get(self.post_id, {})
+        return max((total or 0) + pending.get(self.field, 0), 0)
+
+
+def get_count_version(label: str) -> int:
+    return caching.get_version(f"{COUNT_CACHE_PREFIX}:{label}")
+
+
+def invalidate_counts(sender, **kwargs):
+    """
+    Signal receiver bumping the count version of ``sender`` on create and delete.
+
+    Connected in ``CoreConfig.ready`` to ``post_save`` and ``post_delete``; plain updates are ignored.
+    """
+    if kwargs.get("created") is False:
+        return
+
+    caching.bump_version(f"{COUNT_CACHE_PREFIX}:{sender._meta.label_lower}")
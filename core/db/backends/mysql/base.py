@@ -0,0 +1,10 @@
+from django.db.backends.mysql import base
+
+from core.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """MySQL backend with pooled persistent connections, see ``core.db.pool``."""
+
+    def check_raw_connection(self, connection):
+        connection.ping()
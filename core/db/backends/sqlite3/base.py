@@ -0,0 +1,10 @@
+from django.db.backends.sqlite3 import base
+
+from core.db.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """SQLite backend with pooled connections, used to test ``core.db.pool`` without MySQL."""
+
+    def check_raw_connection(self, connection):
+        connection.execute("SELECT 1").close()
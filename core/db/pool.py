@@ -0,0 +1,249 @@
+"""
+Per-process pool of raw database connections, shared by the threads of a worker.
+
+The pooled backends (``core.db.backends.*``) hand their raw connection back to the pool when Django closes it at
+the end of a request, and take one from the pool instead of opening a new one when Django connects. Connections
+are recycled after ``MAX_AGE`` seconds and health checked when they sat idle longer than
+``HEALTH_CHECK_INTERVAL`` seconds. At most ``MAX_SIZE`` connections exist at once; a thread asking for one beyond
+that waits up to ``TIMEOUT`` seconds for a connection to be released.
+
+Configure it with the ``POOL`` key of a ``DATABASES`` entry::
+
+    "POOL": {"MAX_SIZE": 10, "MAX_AGE": 600, "HEALTH_CHECK_INTERVAL": 30, "TIMEOUT": 5}
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import Counter
+
+DEFAULT_POOL_OPTIONS = {
+    "MAX_SIZE": 10,
+    "MAX_AGE": 600,
+    "HEALTH_CHECK_INTERVAL": 30,
+    "TIMEOUT": 5,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.released_at = time.monotonic()
+        self.uses = 0
+
+
+class ConnectionPool:
+    def __init__(self, max_size=10, max_age=600, health_check_interval=30, timeout=5):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.counters = Counter()
+        self._idle = []
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_options(cls, options: dict):
+        options = {**DEFAULT_POOL_OPTIONS, **(options or {})}
+        return cls(
+            max_size=options["MAX_SIZE"],
+            max_age=options["MAX_AGE"],
+            health_check_interval=options["HEALTH_CHECK_INTERVAL"],
+            timeout=options["TIMEOUT"],
+        )
+
+    def acquire(self, connect, check) -> PooledConnection:
+        """
+        Take an idle connection, or open one with ``connect`` when the pool has room.
+
+        :param connect: Callable returning a new raw connection
+        :param check: Callable raising when a raw connection is no longer usable
+        :raises PoolTimeout: When no connection became available within ``timeout`` seconds
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                break
+
+            now = time.monotonic()
+            if now - entry.created_at > self.max_age:
+                self._discard(entry, "recycled")
+                continue
+            if now - entry.released_at > self.health_check_interval:
+                try:
+                    check(entry.connection)
+                except Exception:
+                    self._discard(entry, "health_check_failures")
+                    continue
+
+            entry.uses += 1
+            self._count("reused")
+            return entry
+
+        try:
+            entry = PooledConnection(connect())
+        except BaseException:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        entry.uses += 1
+        self._count("created")
+        return entry
+
+    def _count(self, name: str):
+        with self._condition:
+            self.counters[name] += 1
+
+    def _reserve(self, deadline: float):
+        """
+        Count a connection as in use and return the most recently released idle one.
+
+        ``None`` means the caller reserved room for a new connection.
+        """
+        with self._condition:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"({self.max_size} in use)."
+                    )
+                self.counters["waits"] += 1
+                self._condition.wait(remaining)
+
+            self._in_use += 1
+            # LIFO keeps a few connections hot and lets the others age out.
+            return self._idle.pop() if self._idle else None
+
+    def release(self, entry: PooledConnection, reusable: bool = True):
+        entry.released_at = time.monotonic()
+        if reusable and entry.released_at - entry.created_at <= self.max_age:
+            with self._condition:
+                self._in_use -= 1
+                self._idle.append(entry)
+                self._condition.notify()
+        else:
+            self._discard(entry, "recycled" if reusable else "discarded")
+
+    def _discard(self, entry: PooledConnection, reason: str):
+        """Close a connection counted as in use and free its slot."""
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self.counters[reason] += 1
+            self._in_use -= 1
+            self._condition.notify()
+
+    def close_idle(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            try:
+                entry.connection.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                **{
+                    name: self.counters[name]
+                    for name in (
+                        "created",
+                        "reused",
+                        "recycled",
+                        "discarded",
+                        "health_check_failures",
+                        "waits",
+                        "timeouts",
+                    )
+                },
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, options: dict) -> ConnectionPool:
+    """Return the pool of ``alias`` for this process; a forked worker never reuses its parent's connections."""
+    key = (alias, os.getpid())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool.from_options(options)
+        return pool
+
+
+def pool_stats() -> dict:
+    """Stats of every pool of this process, by database alias."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = {alias: pool for (alias, owner), pool in _pools.items() if owner == pid}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    ``DatabaseWrapper`` mixin taking raw connections from the process pool and giving them back on ``close``.
+
+    Backends implement ``check_raw_connection`` with their cheapest liveness probe.
+    """
+
+    _pool_entry = None
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return get_pool(self.alias, self.settings_dict.get("POOL"))
+
+    def check_raw_connection(self, connection):
+        raise NotImplementedError
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        try:
+            entry = pool.acquire(
+                functools.partial(super().get_new_connection, conn_params),
+                self.check_raw_connection,
+            )
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+        self._pool_entry, self._pool_pid = entry, os.getpid()
+        return entry.connection
+
+    def init_connection_state(self):
+        # The session state set up here survives in the pooled connection.
+        if self._pool_entry is None or self._pool_entry.uses == 1:
+            super().init_connection_state()
+
+    def _close(self):
+        entry, self._pool_entry = self._pool_entry, None
+        if entry is None or self._pool_pid != os.getpid():
+            return super()._close()
+
+        # A connection closed inside an atomic block has a transaction in progress, don't hand it out again.
+        reusable = not self.in_atomic_block
+        if reusable and not self.get_autocommit():
+            try:
+                with self.wrap_database_errors:
+                    self.connection.rollback()
+            except Exception:
+                reusable = False
+        if self.errors_occurred:
+            # Force a health check before the connection is used again.
+            entry.released_at = float("-inf")
+        self.pool.release(entry, reusable)
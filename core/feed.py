@@ -0,0 +1,156 @@
+"""
+Home feed: posts of the followed users, newest first.
+
+Creating a post writes a ``TimelineEntry`` for its author and for every follower (fan-out-on-write), so a feed page
+is a range scan of the reader's timeline instead of an ``IN (followed ids)`` query over ``Post``. Authors with more
+than ``FEED_FANOUT_MAX_FOLLOWERS`` followers are not fanned out, which would cost one row per follower per post;
+their posts are read from ``Post`` and merged into the feed when it is read (fan-out-on-read). An author dropping
+back to the limit is fanned out again from then on (``User.fanout_resumed_datetime``); their older posts stay read
+from ``Post``, since the ones written meanwhile are in no timeline. Posts found in both sources are merged once.
+"""
+
+from itertools import chain
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.db.models.functions import Now
+
+from core import models
+from core.streaming import iter_chunks
+
+FANOUT_BATCH_SIZE = 1000
+# Posts of a newly followed user copied to the follower's timeline.
+BACKFILL_SIZE = 100
+
+
+def is_fanned_out(follower_count: int) -> bool:
+    return follower_count <= settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def write_timeline(user_ids, posts):
+    """Add ``posts`` to the timelines of ``user_ids``, skipping the entries that already exist."""
+    entries = (
+        models.TimelineEntry(
+            user_id=user_id, post=post, post_created_datetime=post.created_datetime
+        )
+        for user_id in user_ids
+        for post in posts
+    )
+    for chunk in iter_chunks(entries, FANOUT_BATCH_SIZE):
+        models.TimelineEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def fan_out_post(sender, instance, created=False, raw=False, **kwargs):
+    """Signal receiver writing a new post to the timelines of its author and followers."""
+    if not created or raw:
+        return
+
+    recipients = [instance.user_id]
+    follower_count = (
+        models.User.objects.filter(pk=instance.user_id)
+        .values_list("follower_count", flat=True)
+        .first()
+    )
+    if follower_count and is_fanned_out(follower_count):
+        followers = (
+            models.Follow.objects.filter(followee_id=instance.user_id)
+            .values_list("follower_id", flat=True)
+            .iterator(chunk_size=FANOUT_BATCH_SIZE)
+        )
+        recipients = chain(recipients, followers)
+
+    write_timeline(recipients, [instance])
+
+
+def follow_created(sender, instance, created=False, raw=False, **kwargs):
+    """Signal receiver counting the new follower and copying the recent posts of the followee to their timeline."""
+    if not created or raw:
+        return
+
+    models.User.objects.filter(pk=instance.followee_id).update(
+        follower_count=F("follower_count") + 1
+    )
+    followee = models.User.objects.only("follower_count").get(pk=instance.followee_id)
+    if is_fanned_out(followee.follower_count):
+        posts = models.Post.objects.filter(user_id=instance.followee_id).order_by(
+            "-created_datetime", "-id"
+        )[:BACKFILL_SIZE]
+        write_timeline([instance.follower_id], list(posts))
+
+
+def follow_deleted(sender, instance, **kwargs):
+    """Signal receiver uncounting the follower and removing the followee's posts from their timeline."""
+    models.User.objects.filter(pk=instance.followee_id).update(
+        follower_count=F("follower_count") - 1
+    )
+    # The decrement holds the row lock, so exactly one unfollow sees the count cross back to the limit.
+    models.User.objects.filter(
+        pk=instance.followee_id, follower_count=settings.FEED_FANOUT_MAX_FOLLOWERS
+    ).update(fanout_resumed_datetime=Now())
+    models.TimelineEntry.objects.filter(
+        user_id=instance.follower_id, post__user_id=instance.followee_id
+    ).delete()
+
+
+def get_feed_sources(user_id) -> list:
+    """
+    The querysets a feed is merged from, for ``MergedKeysetPagination.paginate_sources``.
+
+    :param user_id: The reader
+    :return: ``(queryset, ordering, to_post)`` tuples
+    """
+    sources = [
+        (
+            models.TimelineEntry.objects.filter(user_id=user_id).select_related(
+                "post__user"
+            ),
+            ("-post_created_datetime", "-post_id"),
+            attrgetter("post"),
+        )
+    ]
+
+    followees = models.Follow.objects.filter(follower_id=user_id)
+    unfanned = list(
+        followees.filter(
+            followee__follower_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS
+        ).values_list("followee_id", flat=True)
+    )
+    resumed = list(
+        followees.filter(
+            followee__follower_count__lte=settings.FEED_FANOUT_MAX_FOLLOWERS,
+            followee__fanout_resumed_datetime__isnull=False,
+        ).values_list("followee_id", flat=True)
+    )
+    if unfanned or resumed:
+        posts = Q(user_id__in=unfanned) | Q(
+            user_id__in=resumed,
+            created_datetime__lt=F("user__fanout_resumed_datetime"),
+        )
+        sources.append(
+            (
+                models.Post.objects.filter(posts).select_related("user"),
+                ("-created_datetime", "-id"),
+                None,
+            )
+        )
+    return sources
+
+
+def set_viewer_flags(posts, user):
+    """
+    Set the ``VIEWER_FLAGS`` of ``user`` on the posts of a feed page.
+
+    A feed page is merged in Python from several sources, so the flags are read for the whole page afterwards, with
+    one ``post_id IN (...)`` query per flag on the ``(user, post)`` indexes of ``Like``/``Comment``.
+    """
+    post_ids = [post.pk for post in posts]
+    for flag, related_name in models.VIEWER_FLAGS.items():
+        model = models.Post._meta.get_field(related_name).related_model
+        marked = set(
+            model.objects.filter(user_id=user.pk, post_id__in=post_ids).values_list(
+                "post_id", flat=True
+            )
+        )
+        for post in posts:
+            setattr(post, flag, post.pk in marked)
@@ -0,0 +1,65 @@
+"""
+Bounded worker pool for password hashing.
+
+PBKDF2 costs tens of milliseconds of CPU per call. Registration and login run it through ``run`` so only
+``PASSWORD_HASHING_WORKERS`` hashes are computed at once and at most ``PASSWORD_HASHING_QUEUE`` more wait for a
+worker. Past that, ``PasswordHashingUnavailable`` (503) is raised right away instead of letting a login storm
+occupy every worker. The pool is per process and a request waiting for a hash holds its server thread, so the
+limits have to stay below the threads of a gunicorn worker to ever be reached, see the settings.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from rest_framework import exceptions, status
+
+
+class PasswordHashingUnavailable(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many authentication requests, try again shortly."
+    default_code = "password_hashing_unavailable"
+    # Sent as Retry-After by DRF's exception handler.
+    wait = 1
+
+
+class HashingPool:
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Threads do not survive a fork, so a pool created before gunicorn forks (preload) is rebuilt per worker.
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hashing"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def run(self, func, *args, **kwargs):
+        """
+        Call ``func`` in the pool and wait for its result.
+
+        :raises PasswordHashingUnavailable: When every worker is busy and the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingUnavailable()
+        try:
+            return self.executor.submit(func, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+
+pool = HashingPool(settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE)
+
+
+def run(func, *args, **kwargs):
+    return pool.run(func, *args, **kwargs)
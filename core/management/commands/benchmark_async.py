@@ -0,0 +1,127 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+DUMMY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    """
+    Django command comparing the sync post list with its async counterpart under slow database latency.
+
+    Every query is delayed by ``--latency`` seconds. The sync endpoint is served by ``--workers`` threads, like a
+    sync gunicorn deployment, while the async endpoint is served by a single event loop, like a uvicorn worker.
+    Only reads are performed, so it can run against an existing database. The cache is replaced by a dummy one so
+    every request reaches the database.
+    """
+
+    help = "Benchmark the async read endpoints against the sync ones with simulated DB latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--latency", type=float, default=0.02, help="Seconds added to each query."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        self.latency = options["latency"]
+        token = AccessToken()
+        token["user_id"] = 0
+        headers = {"Authorization": f"Bearer {token}"}
+
+        connection_created.connect(self.add_latency, dispatch_uid="benchmark_async")
+        for connection in connections.all(initialized_only=True):
+            self.add_latency(None, connection)
+
+        try:
+            with override_settings(CACHES=DUMMY_CACHES):
+                self.benchmark(headers, options)
+        finally:
+            connection_created.disconnect(dispatch_uid="benchmark_async")
+
+    def benchmark(self, headers, options):
+        self.stdout.write(
+            f"{'endpoint':>8} {'req/s':>10} {'p50 (ms)':>10} {'p95 (ms)':>10}"
+        )
+        self.report(
+            "sync",
+            *self.run_sync(
+                reverse("post:post-list"),
+                headers,
+                options["requests"],
+                options["workers"],
+            ),
+        )
+        self.report(
+            "async",
+            *asyncio.run(
+                self.run_async(
+                    reverse("post:async-post-list"),
+                    headers,
+                    options["requests"],
+                    options["concurrency"],
+                )
+            ),
+        )
+
+    def add_latency(self, sender, connection, **kwargs):
+        def delay(execute, sql, params, many, context):
+            time.sleep(self.latency)
+            return execute(sql, params, many, context)
+
+        connection.execute_wrappers.append(delay)
+
+    @staticmethod
+    def run_sync(url, headers, requests: int, workers: int):
+        def get(_):
+            start = time.perf_counter()
+            response = Client().get(url, headers=headers)
+            connections.close_all()
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}.")
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            timings = list(executor.map(get, range(requests)))
+        return time.perf_counter() - start, timings
+
+    @staticmethod
+    async def run_async(url, headers, requests: int, concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def get():
+            async with semaphore:
+                # Each request gets its own thread for the ORM, as the ASGI handler does.
+                async with ThreadSensitiveContext():
+                    start = time.perf_counter()
+                    response = await client.get(url, headers=headers)
+                    if response.status_code != 200:
+                        raise CommandError(
+                            f"GET {url} returned {response.status_code}."
+                        )
+                    return time.perf_counter() - start
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(get() for _ in range(requests)))
+        return time.perf_counter() - start, timings
+
+    def report(self, name: str, elapsed: float, timings):
+        percentiles = statistics.quantiles(timings, n=20)
+        self.stdout.write(
+            f"{name:>8} {len(timings) / elapsed:>10.1f} "
+            f"{statistics.median(timings) * 1000:>10.1f} {percentiles[18] * 1000:>10.1f}"
+        )
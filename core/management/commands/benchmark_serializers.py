@@ -0,0 +1,84 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import models
+from core.serializers import FastListSerializer
+from post.serializers import PostModelSerializer
+
+
+class Command(BaseCommand):
+    """
+    Django command comparing PostModelSerializer with FastListSerializer per page size.
+
+    The posts it needs are created inside a transaction that is rolled back at the end.
+    """
+
+    help = "Benchmark the fast list serializer against PostModelSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        sizes = sorted(options["sizes"])
+        repeat = options["repeat"]
+
+        with transaction.atomic():
+            user = self.create_posts(sizes[-1])
+            queryset = (
+                models.Post.objects.with_viewer_flags(user)
+                .select_related("user")
+                .order_by("-id")
+            )
+            fast = FastListSerializer.for_serializer(PostModelSerializer)
+
+            self.stdout.write(
+                f"{'size':>8} {'model (ms)':>12} {'fast (ms)':>12} {'speedup':>9}"
+            )
+            for size in sizes:
+                model_time = self.measure(
+                    lambda: PostModelSerializer(list(queryset[:size]), many=True).data,
+                    repeat,
+                )
+                fast_time = self.measure(
+                    lambda: fast.serialize(
+                        queryset.values_list(*fast.paths, named=True)[:size]
+                    ),
+                    repeat,
+                )
+                self.stdout.write(
+                    f"{size:>8} {model_time * 1000:>12.2f} {fast_time * 1000:>12.2f} "
+                    f"{model_time / fast_time:>8.1f}x"
+                )
+
+            transaction.set_rollback(True)
+
+    def create_posts(self, count: int):
+        user = models.User.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex}@example.com"
+        )
+        models.Post.objects.bulk_create(
+            (
+                models.Post(title=f"title {index}", content="content " * 50, user=user)
+                for index in range(count)
+            ),
+            batch_size=1000,
+        )
+        return user
+
+    @staticmethod
+    def measure(func, repeat: int) -> float:
+        """Best wall time of ``repeat`` runs, database fetch included."""
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,112 @@
+import csv
+import gzip
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from comment.serializers import CommentModelSerializer
+from core import models, streaming
+from core.serializers import FastListSerializer, get_annotated_fields
+from like.serializers import LikeModelSerializer
+from post.serializers import PostModelSerializer
+
+EXPORTS = {
+    "posts": (models.Post, PostModelSerializer),
+    "likes": (models.Like, LikeModelSerializer),
+    "comments": (models.Comment, CommentModelSerializer),
+}
+
+
+class Command(BaseCommand):
+    """
+    Django command exporting posts, likes or comments as NDJSON or CSV.
+
+    Rows are read in keyset chunks of ``--chunk-size`` and written as they come, so memory stays constant.
+    """
+
+    help = "Export posts of a user, or likes/comments of a post, as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--user", type=int, help="Only rows created by this user.")
+        parser.add_argument(
+            "--post", type=int, help="Only likes/comments of this post."
+        )
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--output", help="File to write, stdout when omitted.")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=streaming.STREAM_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        model, serializer_class = EXPORTS[options["kind"]]
+        queryset = model.objects.all()
+        if options["user"] is not None:
+            queryset = queryset.filter(user_id=options["user"])
+        if options["post"] is not None:
+            if model is models.Post:
+                queryset = queryset.filter(pk=options["post"])
+            else:
+                queryset = queryset.filter(post_id=options["post"])
+
+        # Annotated fields like ``liked_by_me`` are relative to a viewer, which an export has not.
+        fields = serializer_class().fields
+        annotated = get_annotated_fields(serializer_class)
+        serializer = FastListSerializer.for_serializer(
+            serializer_class,
+            [name for name in fields if name not in annotated],
+        )
+        rows = streaming.iter_rows(
+            queryset.values_list(*serializer.paths, named=True),
+            serializer.serialize,
+            chunk_size=options["chunk_size"],
+        )
+
+        stream = self.open_output(options["output"], options["gzip"])
+        try:
+            if options["format"] == "csv":
+                count = self.write_csv(
+                    stream, rows, [name for name, *_ in serializer.plan]
+                )
+            else:
+                count = self.write_ndjson(stream, rows)
+        finally:
+            if stream is not sys.stdout.buffer:
+                stream.close()
+
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} {options['kind']}."))
+
+    @staticmethod
+    def open_output(path, compress: bool):
+        if path is None:
+            if compress:
+                raise CommandError("--gzip requires --output.")
+            return sys.stdout.buffer
+        if compress:
+            return gzip.open(path, "wb")
+        return open(path, "wb")
+
+    @staticmethod
+    def write_ndjson(stream, rows) -> int:
+        count = 0
+        for line in streaming.iter_ndjson(rows):
+            stream.write(line)
+            count += 1
+        return count
+
+    @staticmethod
+    def write_csv(stream, rows, fieldnames) -> int:
+        text = io.TextIOWrapper(
+            stream, encoding="utf-8", newline="", write_through=True
+        )
+        writer = csv.DictWriter(text, fieldnames=fieldnames)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        text.detach()
+        return count
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from core import counters, models
+
+
+class Command(BaseCommand):
+    """
+    Django command writing the write-behind counter deltas that dead workers left in the cache.
+
+    The cache cannot list its keys and a worker killed before its flush was the only one knowing which posts it
+    buffered deltas for, so every post is checked, in id ranges of ``--chunk-size``. Deltas pending for less than
+    ``COUNTER_PENDING_MAX_AGE`` are left to the live flushers.
+    """
+
+    help = "Flush post counter deltas left unflushed in the cache by dead workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        bounds = models.Post.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        if bounds["last"] is None:
+            self.stdout.write("No posts to check.")
+            return
+
+        flushed = 0
+        for low, high in counters.iter_ranges(
+            bounds["first"], bounds["last"] + 1, options["chunk_size"]
+        ):
+            post_ids = counters.flush_stranded(low, high)
+            flushed += len(post_ids)
+            if post_ids and options["verbosity"] >= 2:
+                self.stdout.write(f"Flushed posts {post_ids} in [{low}, {high}).")
+
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} posts."))
@@ -0,0 +1,127 @@
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+
+from core import counters, models
+
+
+def reconcile_chunk(bounds, sleep: float = 0) -> list:
+    """Reconcile one id range, then pause ``sleep`` seconds to leave room for the live traffic."""
+    post_ids = counters.reconcile_range(*bounds)
+    if sleep:
+        time.sleep(sleep)
+    return post_ids
+
+
+class Command(BaseCommand):
+    """
+    Django command recomputing ``Post.like_count`` and ``Post.comment_count`` from the likes and comments.
+
+    Posts are processed in id ranges of ``--chunk-size``, each in its own short transaction, and only the posts
+    whose counters drifted are written. With ``--checkpoint`` the end of the last finished range is saved to a file
+    so an interrupted run resumes from there; the file is removed once every post has been checked. Posts with
+    write-behind deltas still pending are skipped, unless the deltas are older than ``COUNTER_PENDING_MAX_AGE``.
+    """
+
+    help = "Recompute post like and comment counters in resumable id-range chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Reconcile ranges in a pool of this many processes.",
+        )
+        parser.add_argument(
+            "--checkpoint", help="File saving the progress, resumed from when present."
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved checkpoint and start from the first post.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds each process pauses between ranges.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        if options["chunk_size"] < 1 or options["processes"] < 1:
+            raise CommandError("--chunk-size and --processes must be positive.")
+
+        bounds = models.Post.objects.aggregate(first=Min("pk"), last=Max("pk"))
+        if bounds["last"] is None:
+            self.stdout.write("No posts to reconcile.")
+            return
+
+        start = bounds["first"]
+        checkpoint = options["checkpoint"]
+        if checkpoint and not options["restart"]:
+            resumed = self.read_checkpoint(checkpoint)
+            if resumed is not None:
+                start = max(start, resumed)
+                self.stdout.write(f"Resuming from post {start}.")
+
+        ranges = list(
+            counters.iter_ranges(start, bounds["last"] + 1, options["chunk_size"])
+        )
+        worker = functools.partial(reconcile_chunk, sleep=options["sleep"])
+
+        checked = fixed = 0
+        for (low, high), post_ids in zip(
+            ranges, self.map(worker, ranges, options["processes"])
+        ):
+            checked += 1
+            fixed += len(post_ids)
+            if post_ids and options["verbosity"] >= 2:
+                self.stdout.write(f"Fixed posts {post_ids} in [{low}, {high}).")
+            if checkpoint:
+                self.write_checkpoint(checkpoint, high)
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(
+            self.style.SUCCESS(f"Checked {checked} ranges, fixed {fixed} posts.")
+        )
+
+    @staticmethod
+    def map(worker, ranges, processes: int):
+        """
+        Results of ``worker`` for every range, in range order.
+
+        Pool processes open their own database connections, so the ones of this process are closed first instead
+        of being shared with the children.
+        """
+        if processes == 1:
+            yield from map(worker, ranges)
+            return
+
+        connections.close_all()
+        with ProcessPoolExecutor(processes, initializer=django.setup) as executor:
+            yield from executor.map(worker, ranges)
+
+    @staticmethod
+    def read_checkpoint(path):
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return json.load(file)["next_id"]
+
+    @staticmethod
+    def write_checkpoint(path, next_id: int):
+        """Replace the checkpoint atomically, a crash mid-write leaves the previous one."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump({"next_id": next_id}, file)
+        os.replace(temporary, path)
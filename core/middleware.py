@@ -0,0 +1,42 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework import permissions
+
+from core import routers
+
+
+def pin_writer(request, response):
+    """Pin the user of a successful write to the primary, see ``core.routers``."""
+    if request.method in permissions.SAFE_METHODS or response.status_code >= 400:
+        return
+    user = routers.get_request_user(request)
+    if user is not None and user.is_authenticated:
+        routers.pin_to_primary(user.pk)
+
+
+@sync_and_async_middleware
+def ReplicaRoutingMiddleware(get_response):
+    """Expose the request to ``core.routers.ReplicaRouter`` while it is served."""
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            token = routers.current_request.set(request)
+            try:
+                response = await get_response(request)
+            finally:
+                routers.current_request.reset(token)
+            await sync_to_async(pin_writer)(request, response)
+            return response
+
+    else:
+
+        def middleware(request):
+            token = routers.current_request.set(request)
+            try:
+                response = get_response(request)
+            finally:
+                routers.current_request.reset(token)
+            pin_writer(request, response)
+            return response
+
+    return middleware
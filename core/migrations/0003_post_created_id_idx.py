@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_post_like_comment"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-created_datetime", "-id"], name="post_created_id_idx"
+            ),
+        ),
+    ]
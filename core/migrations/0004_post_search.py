@@ -0,0 +1,84 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:14
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE core_post ADD FULLTEXT INDEX post_fulltext_idx (title, content)"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute("ALTER TABLE core_post DROP INDEX post_fulltext_idx")
+
+
+def build_inverted_index(apps, schema_editor):
+    from core.search import tokenize
+
+    if schema_editor.connection.vendor == "mysql":
+        return
+
+    db_alias = schema_editor.connection.alias
+    Post = apps.get_model("core", "Post")
+    PostSearchTerm = apps.get_model("core", "PostSearchTerm")
+
+    for post in Post.objects.using(db_alias).iterator():
+        terms = Counter(tokenize(post.title) + tokenize(post.content))
+        length = sum(terms.values())
+        PostSearchTerm.objects.using(db_alias).bulk_create(
+            PostSearchTerm(
+                post=post, term=term, frequency=frequency, document_length=length
+            )
+            for term, frequency in terms.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_post_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("frequency", models.PositiveIntegerField()),
+                ("document_length", models.PositiveIntegerField()),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="core.post",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="postsearchterm",
+            constraint=models.UniqueConstraint(
+                fields=("term", "post"), name="post_search_term_unique"
+            ),
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(build_inverted_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("window", models.CharField(max_length=8)),
+                ("base", models.IntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trending_scores",
+                        to="core.post",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["window", "base", "-score"], name="trending_rank_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="trendingscore",
+            constraint=models.UniqueConstraint(
+                fields=("post", "window"), name="trending_score_unique"
+            ),
+        ),
+    ]
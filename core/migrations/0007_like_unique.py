@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-18 18:58
+
+from django.db import migrations, models
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    """Keep the oldest like of every (user, post) pair and uncount the others, so the constraint can be added."""
+    Like = apps.get_model("core", "Like")
+    Post = apps.get_model("core", "Post")
+
+    duplicates = (
+        Like.objects.values("user_id", "post_id")
+        .annotate(first_id=models.Min("id"), total=models.Count("id"))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Like.objects.filter(
+            user_id=duplicate["user_id"], post_id=duplicate["post_id"]
+        ).exclude(pk=duplicate["first_id"]).delete()
+        Post.objects.filter(pk=duplicate["post_id"]).update(
+            like_count=models.F("like_count") - (duplicate["total"] - 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_trending"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["user", "post"], name="comment_user_post_idx"),
+        ),
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="like",
+            constraint=models.UniqueConstraint(
+                fields=("user", "post"), name="like_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_like_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="fanout_resumed_datetime",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
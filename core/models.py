@@ -5,6 +5,11 @@ from django.contrib.auth.models import (
 )
 from django.db import models
 
+from core import hashing
+
+# Per-viewer booleans ``PostQuerySet.with_viewer_flags`` can annotate, with the reverse relation they look up.
+VIEWER_FLAGS = {"liked_by_me": "likes", "commented_by_me": "comments"}
+
 
 class UserManager(BaseUserManager):
     def create_user(self, email: str, password: str = None, **extra_fields):
@@ -31,7 +36,7 @@ class UserManager(BaseUserManager):
         user = self.model(
             email=self.normalize_email(email), username=username, **extra_fields
         )
-        user.set_password(password)
+        hashing.run(user.set_password, password)
         user.save(using=self._db)
 
         return user
@@ -56,12 +61,38 @@ class User(AbstractBaseUser, PermissionsMixin):
     username = models.CharField(max_length=50, unique=True)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    follower_count = models.IntegerField(default=0)
+    # When the user's posts were last fanned out again after going over ``FEED_FANOUT_MAX_FOLLOWERS``, see core.feed.
+    fanout_resumed_datetime = models.DateTimeField(null=True, blank=True)
 
     objects = UserManager()
 
     USERNAME_FIELD = "email"
 
 
+class PostQuerySet(models.QuerySet):
+    def with_viewer_flags(self, user, flags=tuple(VIEWER_FLAGS)):
+        """
+        Annotate whether ``user`` liked or commented each post, as ``EXISTS`` subqueries of the same query.
+
+        Each subquery is a lookup of the ``(user, post)`` index of ``Like``/``Comment``, so a page costs no extra
+        query. Anonymous users get constant ``False`` flags.
+
+        :param user: The request user
+        :param flags: Names from ``VIEWER_FLAGS`` to annotate
+        """
+        annotations = {}
+        for flag in flags:
+            if user is None or not user.is_authenticated:
+                annotations[flag] = models.Value(False)
+                continue
+            model = self.model._meta.get_field(VIEWER_FLAGS[flag]).related_model
+            annotations[flag] = models.Exists(
+                model.objects.filter(user_id=user.pk, post_id=models.OuterRef("pk"))
+            )
+        return self.annotate(**annotations)
+
+
 class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -70,24 +101,63 @@ class Post(models.Model):
     like_count = models.IntegerField(default=0)
     comment_count = models.IntegerField(default=0)
 
+    objects = PostQuerySet.as_manager()
 
-class Like(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="likes")
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_datetime", "-id"], name="post_created_id_idx"
+            ),
+        ]
+
+
+class PostSearchTerm(models.Model):
+    """Inverted index entry used by ``core.search`` on backends without a FULLTEXT index."""
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField()
+    document_length = models.PositiveIntegerField()
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.post.like_count += 1
-        self.post.save()
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["term", "post"], name="post_search_term_unique"
+            ),
+        ]
 
-        return self
 
-    def delete(self, *args, **kwargs):
-        deleted = super().delete(*args, **kwargs)
-        self.post.like_count -= 1
-        self.post.save()
+class TrendingScore(models.Model):
+    """Time-decayed score of a post in one trending window, maintained by ``core.trending``."""
 
-        return deleted
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="trending_scores"
+    )
+    window = models.CharField(max_length=8)
+    base = models.IntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "window"], name="trending_score_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["window", "base", "-score"], name="trending_rank_idx"),
+        ]
+
+
+class Like(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="likes")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="like_unique"),
+        ]
 
 
 class Comment(models.Model):
@@ -95,16 +165,50 @@ class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     content = models.TextField()
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.post.comment_count += 1
-        self.post.save()
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "post"], name="comment_user_post_idx"),
+        ]
 
-        return self
 
-    def delete(self, *args, **kwargs):
-        deleted = super().delete(*args, **kwargs)
-        self.post.comment_count -= 1
-        self.post.save()
+class Follow(models.Model):
+    follower = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="following"
+    )
+    followee = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="followers"
+    )
+    created_datetime = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "followee"], name="follow_unique"
+            ),
+        ]
+
 
-        return deleted
+class TimelineEntry(models.Model):
+    """
+    A post in the home feed of ``user``, written by ``core.feed`` when the post is created (fan-out-on-write).
+
+    ``post_created_datetime`` copies the post's creation time so a feed page is read from the
+    ``(user, -post_created_datetime, -post)`` index alone.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    post_created_datetime = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="timeline_unique"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-post_created_datetime", "-post"],
+                name="timeline_user_created_idx",
+            ),
+        ]
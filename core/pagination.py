@@ -1,28 +1,360 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
 
 class CustomPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination whose total comes from a count strategy of ``core.counting``.
+
+    Strategies may estimate the total, so it is only displayed as ``count``: whether a page exists and whether a next
+    one follows is read from the rows, by fetching one row more than the page size.
+    """
+
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 10000
 
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.get_page_queryset(queryset, request, view)
+        if page is None:
+            return None
+
+        results = list(page)
+        if not results and self.page_number > 1:
+            raise self.get_invalid_page_error()
+        self.set_rows(len(results))
+        return results[: self.page_size]
+
+    def prepare_stream(self, queryset, request, view=None):
+        """
+        Resolve the requested page without evaluating it.
+
+        The response status cannot change once streaming started, so a page past the end is checked for first.
+
+        :return: A tuple ``(page_queryset, page_size)``, or ``None`` when pagination is disabled
+        """
+        page = self.get_page_queryset(queryset, request, view)
+        if page is None:
+            return None
+        if self.page_number > 1 and not page[:1].exists():
+            raise self.get_invalid_page_error()
+        return page, self.page_size
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the unevaluated page, with one extra row telling whether a next page follows."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.count_strategy = None
+        if view is not None and hasattr(view, "get_count_strategy"):
+            self.count_strategy = view.get_count_strategy()
+        self.queryset = queryset
+
+        page_number = self.get_page_number(
+            request, DjangoPaginator(queryset, self.page_size)
+        )
+        try:
+            self.page_number = int(page_number)
+        except (TypeError, ValueError):
+            self.page_number = 0
+        if self.page_number < 1:
+            raise self.get_invalid_page_error(page_number)
+
+        start = (self.page_number - 1) * self.page_size
+        end = self.page_number * self.page_size + 1
+        return queryset[start:end]
+
+    def set_rows(self, rows: int):
+        """Record the number of rows read for the page, the extra one included."""
+        self.has_next = rows > self.page_size
+        self.rows = min(rows, self.page_size)
+
+    def get_invalid_page_error(self, page_number=None) -> NotFound:
+        return NotFound(
+            self.invalid_page_message.format(
+                page_number=page_number or self.page_number, message="No results."
+            )
+        )
+
+    def get_count(self) -> int:
+        """
+        The strategy's total, raised to the rows seen so far; on the last page the rows give the exact total.
+        """
+        seen = (self.page_number - 1) * self.page_size + self.rows
+        if not self.has_next:
+            return seen
+        if self.count_strategy is None or not hasattr(self.queryset, "query"):
+            total = DjangoPaginator(self.queryset, self.page_size).count
+        else:
+            total = self.count_strategy.count(self.queryset)
+        return max(total, seen + 1)
+
+    def get_stream_envelope(self, rows: int, first_row, last_row) -> dict:
+        self.set_rows(rows)
+        return {
+            "next": self.get_next_page_number(),
+            "previous": self.get_previous_page_number(),
+            "count": self.get_count(),
+        }
+
     def get_paginated_response(self, data):
         return Response(
             {
                 "next": self.get_next_page_number(),
                 "previous": self.get_previous_page_number(),
-                "count": self.page.paginator.count,
+                "count": self.get_count(),
                 "results": data,
             }
         )
 
     def get_next_page_number(self):
-        if not self.page.has_next():
+        if not self.has_next:
             return None
-        return self.page.next_page_number()
+        return self.page_number + 1
 
     def get_previous_page_number(self):
-        if not self.page.has_previous():
+        if self.page_number <= 1:
             return None
-        return self.page.previous_page_number()
+        return self.page_number - 1
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination that seeks on the ordering columns instead of using OFFSET.
+
+    The ordering is taken from the view's ``cursor_ordering`` and must end with a unique column (usually ``id``),
+    so every row has a distinct position. Cursors are opaque tokens holding the position of the first/last row of
+    the current page, which keeps the cost of a page constant no matter how deep the client scrolls.
+    """
+
+    page_size = CustomPagination.page_size
+    page_size_query_param = CustomPagination.page_size_query_param
+    max_page_size = CustomPagination.max_page_size
+    cursor_query_param = "cursor"
+    mode_query_param = "pagination"
+    ordering = ("-id",)
+    invalid_cursor_message = "Invalid cursor"
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        params = request.query_params
+        return (
+            cls.cursor_query_param in params
+            or params.get(cls.mode_query_param) == "cursor"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request, view)))
+
+    def set_page(self, results: list) -> list:
+        """Keep the first ``page_size`` rows read in cursor order and work out the next/previous links."""
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        reverse, position = self.cursor if self.cursor else (False, None)
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Return the unevaluated page, with one extra row telling whether more rows follow."""
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, "cursor_ordering", None) or self.ordering)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+
+        self.cursor = self.decode_cursor(request)
+        reverse, position = self.cursor if self.cursor else (False, None)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(queryset.model, ordering, position))
+
+        return queryset[: self.page_size + 1]
+
+    def prepare_stream(self, queryset, request, view=None):
+        """
+        Resolve the requested page without evaluating it, see ``CustomPagination.prepare_stream``.
+
+        Backward pages are read in reverse order and have to be flipped, so they are not streamed.
+        """
+        page = self.get_page_queryset(queryset, request, view)
+        if self.cursor and self.cursor[0]:
+            return None
+        return page, self.page_size
+
+    def get_stream_envelope(self, rows: int, first_row, last_row) -> dict:
+        self.has_next = rows > self.page_size
+        self.has_previous = self.cursor is not None
+        self.page = [row for row in (first_row, last_row) if row is not None]
+        return {
+            "next": self.get_next_cursor(),
+            "previous": self.get_previous_cursor(),
+        }
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_cursor(),
+                "previous": self.get_previous_cursor(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self._position(self.page[-1]))
+
+    def get_previous_cursor(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, self._position(self.page[0]))
+
+    def encode_cursor(self, reverse: bool, position: list) -> str:
+        payload = json.dumps({"r": int(reverse), "p": position}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            reverse = bool(payload["r"])
+            position = payload["p"]
+        except (TypeError, KeyError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+
+        return reverse, position
+
+    def _position(self, instance) -> list:
+        position = []
+        for field in self.fields:
+            value = getattr(instance, field)
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    @staticmethod
+    def _invert(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _seek(self, model, ordering, position) -> Q:
+        """
+        Build the row-value comparison ``(a, b) < (x, y)`` as ``a < x OR (a = x AND b < y)``, which every backend
+        can resolve with the composite index that backs the ordering.
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            value = self._to_python(model, name, value)
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _to_python(self, model, name: str, value):
+        """Convert a position value read from a cursor for the column ``name``, a client may have tampered with it."""
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            field = field.target_field
+        try:
+            value = field.to_python(value)
+            if value is None:
+                raise ValidationError("Cursor positions cannot be null.")
+            field.run_validators(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return value
+
+
+class MergedKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination over rows merged from several querysets, e.g. a feed read from timeline entries and posts.
+
+    Every source is sought and sliced on its own columns, then the rows are merged on the view's
+    ``cursor_ordering``. All the ordering columns must sort in the same direction.
+    """
+
+    def paginate_sources(self, sources, request, view=None):
+        """
+        :param sources: ``(queryset, ordering, to_row)`` tuples; ``ordering`` lists the columns of the queryset
+            matching ``cursor_ordering`` and ``to_row`` maps an instance to the row returned (``None`` for as is)
+        :return: The rows of the page
+        """
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, "cursor_ordering", None) or self.ordering)
+        self.fields = [field.lstrip("-") for field in self.ordering]
+        self.cursor = self.decode_cursor(request)
+        reverse, position = self.cursor if self.cursor else (False, None)
+
+        rows = {}
+        for queryset, ordering, to_row in sources:
+            if reverse:
+                ordering = tuple(self._invert(field) for field in ordering)
+            queryset = queryset.order_by(*ordering)
+            if position is not None:
+                queryset = queryset.filter(
+                    self._seek(queryset.model, ordering, position)
+                )
+            for instance in queryset[: self.page_size + 1]:
+                row = to_row(instance) if to_row else instance
+                rows[row.pk] = row
+
+        descending = self.ordering[0].startswith("-") != reverse
+        results = sorted(
+            rows.values(),
+            key=lambda row: tuple(getattr(row, field) for field in self.fields),
+            reverse=descending,
+        )
+        return self.set_page(results[: self.page_size + 1])
@@ -0,0 +1,173 @@
+"""
+Read-replica routing.
+
+Reads made while serving a ``GET``/``HEAD`` request go to a healthy replica from ``REPLICA_DATABASES``; everything
+else goes to ``default``. ``core.middleware.ReplicaRoutingMiddleware`` records the current request and, after a
+successful write, pins its user to ``default`` for ``REPLICA_PIN_SECONDS`` so they read their own writes.
+
+A replica is healthy when it answers and lags at most ``REPLICA_MAX_LAG`` seconds behind the primary. Health is
+checked at most every ``REPLICA_HEALTH_CHECK_INTERVAL`` seconds per process.
+
+Cached responses and ETags are keyed by the versions of ``core.caching``, which writers bump right away; a replica
+read made just after a bump could store stale data under the new version for every client. Views building such a
+response from a version bumped within ``replica_lag_window`` call ``use_primary`` first.
+
+Pins and versions live in the cache, which has to be shared by every process (see ``core.checks``).
+"""
+
+import contextvars
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework import permissions
+
+current_request = contextvars.ContextVar("replica_routing_request", default=None)
+
+
+def get_request_user(request):
+    """
+    The user DRF (or an async view) authenticated, ``None`` before that.
+
+    The lazy session user of ``AuthenticationMiddleware`` is not evaluated: loading it queries the database, which
+    would route through here again.
+    """
+    user = request.__dict__.get("user")
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+def pin_key(user_id) -> str:
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id) -> bool:
+    return cache.get(pin_key(user_id)) is not None
+
+
+def replica_lag_window() -> float:
+    """Seconds a write may take to reach the replicas still routed to: a lag above the limit is only noticed at
+    the next health check."""
+    return settings.REPLICA_MAX_LAG + settings.REPLICA_HEALTH_CHECK_INTERVAL
+
+
+def is_recent(modified: float) -> bool:
+    """Whether a change made at the ``modified`` timestamp may still be missing from a replica."""
+    return bool(settings.REPLICA_DATABASES) and (
+        time.time() - modified < replica_lag_window()
+    )
+
+
+def use_primary(request):
+    """Send the remaining reads of ``request`` (a Django or DRF request) to the primary."""
+    getattr(request, "_request", request)._replica_use_primary = True
+
+
+def measure_lag(connection):
+    """
+    Seconds ``connection`` lags behind its primary, ``None`` when replication is stopped.
+
+    Databases without replication status (e.g. SQLite) only need to answer.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor != "mysql":
+            cursor.execute("SELECT 1")
+            return 0
+
+        cursor.execute("SHOW REPLICA STATUS")
+        row = cursor.fetchone()
+        if row is None:
+            return 0
+        status = dict(zip((column[0] for column in cursor.description), row))
+        return status.get("Seconds_Behind_Source")
+
+
+class ReplicaHealth:
+    def __init__(self):
+        self._checks = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias: str) -> bool:
+        now = time.monotonic()
+        checked_at, healthy = self._checks.get(alias, (None, False))
+        if (
+            checked_at is not None
+            and now - checked_at < settings.REPLICA_HEALTH_CHECK_INTERVAL
+        ):
+            return healthy
+
+        with self._lock:
+            checked_at, healthy = self._checks.get(alias, (None, False))
+            if (
+                checked_at is None
+                or now - checked_at >= settings.REPLICA_HEALTH_CHECK_INTERVAL
+            ):
+                healthy = self.check(alias)
+                self._checks[alias] = (time.monotonic(), healthy)
+            return healthy
+
+    @staticmethod
+    def check(alias: str) -> bool:
+        try:
+            lag = measure_lag(connections[alias])
+        except Exception:
+            return False
+        return lag is not None and lag <= settings.REPLICA_MAX_LAG
+
+    def reset(self):
+        with self._lock:
+            self._checks.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        request = current_request.get()
+        if request is None or not self.reads_from_replica(request):
+            return DEFAULT_DB_ALIAS
+
+        replicas = [
+            alias
+            for alias in settings.REPLICA_DATABASES
+            if replica_health.is_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+    @staticmethod
+    def reads_from_replica(request) -> bool:
+        if request.method not in permissions.SAFE_METHODS:
+            return False
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return False
+        if request.__dict__.get("_replica_use_primary"):
+            return False
+
+        user = get_request_user(request)
+        if user is None or not user.is_authenticated:
+            return True
+
+        pinned = request.__dict__.get("_replica_pinned")
+        if pinned is None or pinned[0] != user.pk:
+            pinned = request._replica_pinned = (user.pk, is_pinned(user.pk))
+        return not pinned[1]
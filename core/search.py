@@ -0,0 +1,227 @@
+"""
+Full-text search for posts.
+
+MySQL uses a ``FULLTEXT`` index on ``(title, content)`` and ranks with ``MATCH ... AGAINST``. Other backends
+(SQLite in tests and local runs) use ``PostSearchTerm``, an inverted index kept up to date on every write, and
+rank with BM25 computed in SQL so results still paginate through the regular pagination class.
+"""
+
+import math
+import re
+from collections import Counter
+
+from django.db import connections
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from core import models
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+
+
+def tokenize(text: str) -> list:
+    """
+    Split ``text`` into lowercase terms, dropping the ones too short to be useful.
+
+    :param text: The text to split
+    :return: The list of terms, repeated terms included
+    """
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall((text or "").lower())
+        if len(token) >= MIN_TERM_LENGTH
+    ]
+
+
+def no_results(queryset):
+    """An empty result, still annotated with ``rank`` so it can be ordered like a real one."""
+    return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def match_only(queryset, also: Q):
+    """The rows matched by ``also`` alone, ranked below every text match."""
+    if not also:
+        return no_results(queryset)
+    return queryset.filter(also).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+class FullTextBackend:
+    """MySQL ``FULLTEXT`` search, the index itself is maintained by MySQL."""
+
+    def index(self, post: models.Post):
+        pass
+
+    def search(self, queryset, query: str, also=Q()):
+        table = connections[queryset.db].ops.quote_name(models.Post._meta.db_table)
+        rank = RawSQL(
+            f"MATCH({table}.`title`, {table}.`content`) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+            [query],
+            output_field=FloatField(),
+        )
+        return queryset.annotate(rank=rank).filter(Q(rank__gt=0) | also)
+
+
+class InvertedIndexBackend:
+    """
+    Inverted index over title and content stored in ``PostSearchTerm``, ranked with Okapi BM25.
+
+    The collection statistics (document count, average length, document frequencies) are read with two small
+    aggregate queries, the score itself is a ``SUM`` over the matching postings of each post.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def index(self, post: models.Post):
+        terms = Counter(tokenize(post.title) + tokenize(post.content))
+        length = sum(terms.values())
+
+        postings = models.PostSearchTerm.objects.using(post._state.db)
+        postings.filter(post=post).delete()
+        postings.bulk_create(
+            models.PostSearchTerm(
+                post=post, term=term, frequency=frequency, document_length=length
+            )
+            for term, frequency in terms.items()
+        )
+
+    def search(self, queryset, query: str, also=Q()):
+        terms = sorted(set(tokenize(query)))
+        postings = models.PostSearchTerm.objects.using(queryset.db)
+
+        stats = postings.aggregate(
+            documents=Count("post", distinct=True), tokens=Sum("frequency")
+        )
+        documents = stats["documents"] or 0
+        frequencies = {}
+        if documents:
+            frequencies = dict(
+                postings.filter(term__in=terms)
+                .values("term")
+                .annotate(documents=Count("post"))
+                .values_list("term", "documents")
+            )
+        if not frequencies:
+            return match_only(queryset, also)
+
+        average_length = stats["tokens"] / documents
+        idf = Case(
+            *(
+                When(term=term, then=Value(self.idf(documents, count)))
+                for term, count in frequencies.items()
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        frequency = Cast(F("frequency"), FloatField())
+        length = Cast(F("document_length"), FloatField())
+        saturation = (frequency * Value(self.k1 + 1)) / (
+            frequency
+            + Value(self.k1)
+            * (Value(1 - self.b) + Value(self.b) * length / Value(average_length))
+        )
+
+        matching = postings.filter(term__in=list(frequencies))
+        scores = (
+            matching.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(score=Sum(idf * saturation, output_field=FloatField()))
+            .values("score")
+        )
+        return queryset.filter(Q(pk__in=matching.values("post")) | also).annotate(
+            rank=Coalesce(Subquery(scores), Value(0.0))
+        )
+
+    @staticmethod
+    def idf(documents: int, matching: int) -> float:
+        return math.log(1 + (documents - matching + 0.5) / (matching + 0.5))
+
+
+def get_backend(using: str = "default"):
+    if connections[using].vendor == "mysql":
+        return FullTextBackend()
+    return InvertedIndexBackend()
+
+
+def search_posts(queryset, query: str, also=Q()):
+    """
+    Restrict ``queryset`` to the posts matching ``query``, annotated with their ``rank``.
+
+    :param queryset: A ``Post`` queryset
+    :param query: The raw search string
+    :param also: Condition selecting more posts, which get a rank of 0
+    :return: The filtered queryset, empty when the query has no usable terms and ``also`` matches nothing
+    """
+    if not tokenize(query):
+        return match_only(queryset, also)
+    return get_backend(queryset.db).search(queryset, query, also)
+
+
+def index_post(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Signal receiver keeping the search index of a post in sync with its title and content.
+
+    Saves that only touch other columns (e.g. the like/comment counters) are skipped.
+    """
+    if update_fields is not None and not {"title", "content"} & set(update_fields):
+        return
+    get_backend(instance._state.db or "default").index(instance)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` backed by ``search_posts`` instead of ``icontains`` lookups.
+
+    ``search_fields`` with a lookup prefix, e.g. ``^user__username``, also match the posts whose related row matches
+    the query. The related rows are looked up first on their own indexed column, so the full-text condition is only
+    widened with an ``IN`` list, and not at all when none matches. Results are ordered by rank unless the client
+    asked for an explicit ``?ordering=``.
+    """
+
+    max_related_matches = 100
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        if not query.strip():
+            return queryset
+
+        also = self.get_related_matches(queryset, view, query.strip())
+        queryset = search_posts(queryset, query, also)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by("-rank", "-id")
+        return queryset
+
+    def get_related_matches(self, queryset, view, query: str) -> Q:
+        matches = Q()
+        for field in getattr(view, "search_fields", None) or ():
+            lookup = self.lookup_prefixes.get(field[0])
+            if lookup not in ("istartswith", "iexact"):
+                continue
+            relation, column = field[1:].split(LOOKUP_SEP, 1)
+            related = queryset.model._meta.get_field(relation).related_model
+            ids = list(
+                related._default_manager.filter(
+                    **{f"{column}__{lookup}": query}
+                ).values_list("pk", flat=True)[: self.max_related_matches]
+            )
+            if ids:
+                matches |= Q(**{f"{relation}__in": ids})
+        return matches
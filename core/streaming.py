@@ -0,0 +1,111 @@
+"""
+Incremental JSON output for large list pages.
+
+Rows are read, serialized and rendered one chunk at a time, so the memory a request needs depends on the chunk size
+instead of the page size. ``iterator()`` cannot provide the chunks: mysqlclient buffers the whole result set on the
+client. Each chunk is its own query instead, selecting rows by primary key: a page reads its primary keys first (see
+``iter_page_chunks``), exports have no page bound at all and seek past the previous chunk (see
+``iter_keyset_chunks``).
+"""
+
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from core.renderers import FastJSONRenderer
+
+STREAM_CHUNK_SIZE = 500
+
+
+def iter_chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def stream_page(paginator, page, limit: int, serialize, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield a paginated response body as JSON fragments.
+
+    The envelope holds the same keys as the paginator's regular response. ``results`` comes first because some
+    keys (the keyset cursors) are only known once the last row has been read.
+
+    :param paginator: A paginator implementing ``get_stream_envelope``
+    :param page: The unevaluated page queryset returned by ``prepare_stream``
+    :param limit: Number of rows to render, the page may hold one extra row used to detect a next page
+    :param serialize: Callable turning a list of rows into a list of primitives
+    :param chunk_size: Rows fetched, serialized and rendered at a time
+    """
+    renderer = FastJSONRenderer()
+    pks = list(page.values_list("pk", flat=True))
+    first_row = last_row = None
+
+    yield b'{"results":['
+    for chunk in iter_page_chunks(page, pks[:limit], chunk_size):
+        body = renderer.render(serialize(chunk))[1:-1]
+        yield body if first_row is None else b"," + body
+        if first_row is None:
+            first_row = chunk[0]
+        last_row = chunk[-1]
+
+    envelope = paginator.get_stream_envelope(len(pks), first_row, last_row)
+    yield b"]," + renderer.render(envelope)[1:] if envelope else b"]}"
+
+
+def iter_page_chunks(page, pks: list, chunk_size: int):
+    """
+    Yield the rows of the sliced queryset ``page`` with the primary keys ``pks``, ``chunk_size`` at a time.
+
+    ``pks`` are read from the page beforehand, so every chunk is a run of consecutive rows: fetched by primary key
+    with the page's ordering, it comes back in page order. Rows deleted meanwhile are skipped.
+    """
+    rows = page.all()
+    rows.query.clear_limits()
+    for chunk_pks in iter_chunks(pks, chunk_size):
+        chunk = list(rows.filter(pk__in=chunk_pks))
+        if chunk:
+            yield chunk
+
+
+def streaming_json_response(chunks) -> StreamingHttpResponse:
+    return StreamingHttpResponse(chunks, content_type="application/json")
+
+
+def iter_keyset_chunks(queryset, chunk_size: int):
+    """
+    Yield the rows of ``queryset`` in primary key order, ``chunk_size`` at a time.
+
+    ``iterator()`` is not enough: mysqlclient buffers the whole result set on the client, so every chunk is its own
+    query seeking past the previous one. The primary keys of a chunk are read first, which bounds it for
+    ``values_list`` rows that do not hold the primary key.
+    """
+    queryset = queryset.order_by("pk")
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return
+        yield list(queryset.filter(pk__lte=pks[-1]))
+        if len(pks) < chunk_size:
+            return
+        queryset = queryset.filter(pk__gt=pks[-1])
+
+
+def iter_rows(queryset, serialize, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield every row of ``queryset`` as a primitive dict, in primary key order, reading it in keyset chunks."""
+    for chunk in iter_keyset_chunks(queryset, chunk_size):
+        yield from serialize(chunk)
+
+
+def iter_ndjson(rows):
+    """Render dict rows as newline-delimited JSON, one line per row."""
+    renderer = FastJSONRenderer()
+    for row in rows:
+        yield renderer.render(row) + b"\n"
+
+
+def ndjson_response(rows, filename: str) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(
+        iter_ndjson(rows), content_type="application/x-ndjson"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
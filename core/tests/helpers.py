@@ -1,6 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from core import models
+from core.pagination import KeysetPagination
+
+# Cursor positions a client may forge, for orderings of one and two columns.
+TAMPERED_POSITIONS = {
+    1: [["abc"], [[1]], [None], [{"a": 1}], [10**30]],
+    2: [
+        ["x", "y"],
+        [None, None],
+        [{"a": 1}, 1],
+        ["2024-01-01T00:00:00+00:00", "abc"],
+        [1, [1]],
+    ],
+}
 
 
 def create_post(title: str, content: str) -> models.Post:
@@ -33,3 +48,42 @@ def create_comment(
 
 def create_like(post: models.Post, user: models.User) -> models.Like:
     return models.Like.objects.create(post=post, user=user)
+
+
+def assert_query_budget(test_case, get_response, add_rows, sizes=(1, 5, 20)):
+    """
+    Fails when the number of queries an endpoint runs grows with the amount of data it returns.
+
+    For each size, ``add_rows(size)`` must leave at least ``size`` rows visible to the endpoint and
+    ``get_response(size)`` must perform the request (e.g. with ``page_size=size``). Every request has to run
+    the same number of queries, which catches N+1 lookups in serializers and querysets.
+
+    :param test_case: The running TestCase, used for the assertions
+    :param get_response: Callable receiving the size and returning the response
+    :param add_rows: Callable receiving the size and creating the rows needed for it
+    :param sizes: The sizes to compare
+    :return: The number of queries each request ran
+    """
+    counts = []
+    for size in sizes:
+        add_rows(size)
+        with CaptureQueriesContext(connection) as context:
+            res = get_response(size)
+        test_case.assertLess(res.status_code, 300)
+        counts.append(len(context.captured_queries))
+
+    test_case.assertEqual(
+        len(set(counts)),
+        1,
+        f"Query count grows with the data size: {dict(zip(sizes, counts))}",
+    )
+    return counts[0]
+
+
+def tampered_cursors(columns: int) -> list:
+    """Well-formed cursors whose position values do not fit an ordering of ``columns`` columns."""
+    return [
+        KeysetPagination().encode_cursor(reverse, position)
+        for position in TAMPERED_POSITIONS[columns]
+        for reverse in (False, True)
+    ]
@@ -0,0 +1,79 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import authentication
+from core.tests import helpers
+from user.serializers import CustomTokenObtainPairSerializer
+
+LIKE_URL = reverse("like:like-list")
+ME_URL = reverse("user:me")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        authentication.verified_tokens.clear()
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = helpers.create_user(
+            email="reader@example.com", password="testpass123", name="Reader"
+        )
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_read_does_not_load_user(self):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(LIKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any("core_user" in query["sql"] for query in context.captured_queries)
+        )
+
+    def test_write_loads_full_user(self):
+        res = self.client.post(LIKE_URL, {"post": self.post.id}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["user"], self.user.id)
+
+    def test_verified_token_cached(self):
+        self.client.get(LIKE_URL)
+        self.client.get(LIKE_URL)
+
+        info = authentication.verified_tokens.info()
+        self.assertEqual(info["misses"], 1)
+        self.assertEqual(info["hits"], 1)
+
+    def test_invalid_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+
+        res = self.client.get(LIKE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(authentication.verified_tokens.info()["size"], 0)
+
+    def test_me_reads_current_profile(self):
+        self.user.name = "Renamed"
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["name"], "Renamed")
+
+    def test_cache_is_bounded(self):
+        cache = authentication.VerifiedTokenCache(maxsize=2)
+        for index in range(3):
+            cache.set(str(index).encode(), {"exp": 2**40})
+
+        self.assertIsNone(cache.get(b"0"))
+        self.assertIsNotNone(cache.get(b"2"))
+
+    def test_expired_token_evicted(self):
+        cache = authentication.VerifiedTokenCache()
+        cache.set(b"token", {"exp": 1})
+
+        self.assertIsNone(cache.get(b"token"))
@@ -0,0 +1,331 @@
+import io
+import json
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import checks, counters, models
+from core.tests import helpers
+
+
+def post_updates(context) -> list:
+    return [
+        query["sql"]
+        for query in context.captured_queries
+        if query["sql"].startswith('UPDATE "core_post"')
+    ]
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+        self.other = models.Post.objects.create(
+            title="other", content="x", user=self.user
+        )
+        self.likers = [
+            helpers.create_user(email=f"liker{index}@example.com") for index in range(3)
+        ]
+
+    def counts(self, post):
+        post.refresh_from_db()
+        return post.like_count, post.comment_count
+
+    def test_like_counted_without_loading_post(self):
+        with CaptureQueriesContext(connection) as context:
+            models.Like.objects.create(post_id=self.post.id, user=self.user)
+
+        self.assertEqual(len(post_updates(context)), 1)
+        self.assertIn('"like_count" + 1', post_updates(context)[0])
+        self.assertFalse(
+            [
+                query
+                for query in context.captured_queries
+                if query["sql"].startswith('SELECT "core_post"')
+            ]
+        )
+        self.assertEqual(self.counts(self.post), (1, 0))
+
+    def test_saving_existing_like_not_counted(self):
+        like = helpers.create_like(post=self.post, user=self.user)
+
+        like.save()
+
+        self.assertEqual(self.counts(self.post), (1, 0))
+
+    def test_queryset_delete_grouped_per_delta(self):
+        for user in self.likers:
+            helpers.create_like(post=self.post, user=user)
+            helpers.create_comment(self.other, "comment", user)
+        helpers.create_like(post=self.other, user=self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            models.Like.objects.all().delete()
+
+        self.assertEqual(len(post_updates(context)), 2)
+        self.assertEqual(self.counts(self.post), (0, 0))
+        self.assertEqual(self.counts(self.other), (0, 3))
+
+    def test_user_delete_cascades_to_counters(self):
+        liker = self.likers[0]
+        helpers.create_like(post=self.post, user=liker)
+        helpers.create_like(post=self.other, user=liker)
+        helpers.create_comment(self.post, "comment", liker)
+        helpers.create_like(post=self.post, user=self.user)
+
+        liker.delete()
+
+        self.assertEqual(self.counts(self.post), (1, 0))
+        self.assertEqual(self.counts(self.other), (0, 0))
+
+    def test_post_delete_does_not_update_deleted_post(self):
+        for user in self.likers:
+            helpers.create_like(post=self.other, user=user)
+
+        with CaptureQueriesContext(connection) as context:
+            self.other.delete()
+
+        self.assertEqual(post_updates(context), [])
+        self.assertEqual(models.Like.objects.count(), 0)
+
+
+@override_settings(COUNTER_WRITE_BEHIND=True, COUNTER_FLUSH_INTERVAL_MS=0)
+class WriteBehindCounterTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+        self.likers = [
+            helpers.create_user(email=f"liker{index}@example.com") for index in range(3)
+        ]
+        buffer = mock.patch.object(
+            counters, "write_behind", counters.WriteBehindBuffer()
+        )
+        self.buffer = buffer.start()
+        self.addCleanup(buffer.stop)
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def like_all(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for user in self.likers:
+                helpers.create_like(post=self.post, user=user)
+            helpers.create_comment(self.post, "comment", self.user)
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.comment_count
+
+    def test_deltas_buffered_until_flush(self):
+        with CaptureQueriesContext(connection) as context:
+            self.like_all()
+
+        self.assertEqual(post_updates(context), [])
+        self.assertEqual(self.counts(), (0, 0))
+        self.assertEqual(
+            counters.get_pending([self.post.id]),
+            {self.post.id: {"like_count": 3, "comment_count": 1}},
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.buffer.flush(), [self.post.id])
+
+        self.assertEqual(len(post_updates(context)), 2)
+        self.assertEqual(self.counts(), (3, 1))
+        self.assertEqual(counters.get_pending([self.post.id]), {})
+
+    def test_increments_and_decrements_coalesced(self):
+        self.like_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Like.objects.filter(user=self.likers[0]).delete()
+
+        self.buffer.flush()
+
+        self.assertEqual(self.counts(), (2, 1))
+
+    def test_reads_merge_unflushed_deltas(self):
+        url = reverse("post:post-detail", kwargs={"pk": self.post.id})
+        self.client.get(url)
+        self.like_all()
+
+        for _ in range(2):
+            res = self.client.get(url)
+            self.assertEqual(
+                (res.data["like_count"], res.data["comment_count"]), (3, 1)
+            )
+            res = self.client.get(reverse("post:post-list"))
+            self.assertEqual(res.data["results"][0]["like_count"], 3)
+            res = self.client.get(reverse("post:post-list"), {"stream": "true"})
+            body = json.loads(b"".join(res.streaming_content))
+            self.assertEqual(body["results"][0]["like_count"], 3)
+            self.buffer.flush()
+
+    def test_failed_flush_keeps_deltas(self):
+        self.like_all()
+
+        with mock.patch.object(counters, "write", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+
+        self.assertEqual(self.counts(), (0, 0))
+        self.buffer.flush()
+        self.assertEqual(self.counts(), (3, 1))
+
+    def test_buffers_flushing_same_post_write_deltas_once(self):
+        self.like_all()
+        other = counters.WriteBehindBuffer()
+        decr = cache.decr
+        flushed = []
+
+        def flush_other(key, delta):
+            # The other process reads the same amounts before this one takes them.
+            if not flushed:
+                flushed.append(None)
+                flushed[0] = other.flush([self.post.id])
+            return decr(key, delta)
+
+        with mock.patch.object(counters.cache, "decr", side_effect=flush_other):
+            self.assertEqual(self.buffer.flush(), [self.post.id])
+
+        self.assertEqual(flushed, [[]])
+        self.assertEqual(self.counts(), (3, 1))
+        self.assertEqual(counters.get_pending([self.post.id]), {})
+        self.assertEqual(other.flush([self.post.id]), [])
+        self.assertEqual(self.counts(), (3, 1))
+        self.assertIsNone(cache.get(counters.flush_lock_key(self.post.id)))
+
+    def test_reconcile_skips_posts_with_pending_deltas(self):
+        self.like_all()
+
+        self.assertEqual(counters.reconcile_range(self.post.id, self.post.id + 1), [])
+        self.assertEqual(self.counts(), (0, 0))
+
+    def strand(self):
+        """Leave the deltas as a worker killed before its flush would."""
+        self.buffer._dirty.clear()
+        cache.set(counters.pending_since_key(self.post.id), 0, None)
+
+    def test_reconcile_repairs_stranded_deltas(self):
+        self.like_all()
+        self.strand()
+
+        self.assertEqual(
+            counters.reconcile_range(self.post.id, self.post.id + 1), [self.post.id]
+        )
+        self.assertEqual(self.counts(), (3, 1))
+        self.assertEqual(counters.get_pending([self.post.id]), {})
+        self.buffer.flush([self.post.id])
+        self.assertEqual(self.counts(), (3, 1))
+
+    def test_flush_pending_counters_writes_stranded_deltas(self):
+        other = models.Post.objects.create(title="other", content="x", user=self.user)
+        self.like_all()
+        self.strand()
+        with self.captureOnCommitCallbacks(execute=True):
+            helpers.create_like(post=other, user=self.user)
+
+        out = io.StringIO()
+        call_command("flush_pending_counters", "--chunk-size", "1", stdout=out)
+
+        self.assertIn("Flushed 1 posts", out.getvalue())
+        self.assertEqual(self.counts(), (3, 1))
+        other.refresh_from_db()
+        self.assertEqual(other.like_count, 0)
+        self.assertEqual(
+            counters.get_pending([self.post.id, other.id]),
+            {other.id: {"like_count": 1}},
+        )
+        self.assertIsNone(cache.get(counters.pending_since_key(self.post.id)))
+
+
+class WriteBehindCacheCheckTests(SimpleTestCase):
+    filebased = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": "/tmp/posts-api-cache",
+        }
+    }
+    memcached = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": "127.0.0.1:11211",
+        }
+    }
+
+    def test_write_behind_with_non_atomic_cache(self):
+        with self.settings(COUNTER_WRITE_BEHIND=True, CACHES=self.filebased):
+            errors = checks.check_write_behind_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.E002"])
+
+    def test_write_behind_with_atomic_cache(self):
+        with self.settings(COUNTER_WRITE_BEHIND=True, CACHES=self.memcached):
+            self.assertEqual(checks.check_write_behind_cache(None), [])
+
+    def test_non_atomic_cache_without_write_behind(self):
+        with self.settings(COUNTER_WRITE_BEHIND=False, CACHES=self.filebased):
+            self.assertEqual(checks.check_write_behind_cache(None), [])
+
+
+class ConcurrentCounterTests(TransactionTestCase):
+    threads = 8
+    likes_per_thread = 5
+
+    def test_concurrent_likes_counted_exactly(self):
+        post = helpers.create_post(title="test", content="testcontent")
+        users = [
+            helpers.create_user(email=f"liker{index}@example.com")
+            for index in range(self.threads * self.likes_per_thread)
+        ]
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def like(chunk):
+            try:
+                barrier.wait()
+                for user in chunk:
+                    create_like(user)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        def create_like(user, attempts=50):
+            # SQLite's shared in-memory test database fails with "table is locked" instead of waiting for the
+            # lock; the transaction rolled back entirely, so it is retried.
+            for attempt in range(attempts):
+                try:
+                    with transaction.atomic():
+                        return models.Like.objects.create(post_id=post.id, user=user)
+                except OperationalError:
+                    if attempt == attempts - 1:
+                        raise
+                    time.sleep(0.01)
+
+        step = self.threads
+        workers = [
+            threading.Thread(target=like, args=(users[index::step],))
+            for index in range(step)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        post.refresh_from_db()
+        self.assertEqual(post.like_count, len(users))
+        self.assertEqual(post.like_count, models.Like.objects.count())
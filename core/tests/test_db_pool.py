@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.db import OperationalError
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.db import pool
+from core.tests import helpers
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = pool.ConnectionPool(
+            max_size=2, max_age=60, health_check_interval=60, timeout=0.05
+        )
+
+    def test_release_makes_connection_reusable(self):
+        raw = mock.Mock()
+        entry = self.pool.acquire(lambda: raw, mock.Mock())
+        self.pool.release(entry)
+
+        self.assertIs(self.pool.acquire(mock.Mock(), mock.Mock()).connection, raw)
+        self.assertEqual(self.pool.stats()["created"], 1)
+        self.assertEqual(self.pool.stats()["reused"], 1)
+
+    def test_acquire_times_out_when_exhausted(self):
+        self.pool.acquire(mock.Mock, mock.Mock())
+        self.pool.acquire(mock.Mock, mock.Mock())
+
+        with self.assertRaises(pool.PoolTimeout):
+            self.pool.acquire(mock.Mock, mock.Mock())
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+    def test_acquire_waits_for_release(self):
+        self.pool.timeout = 5
+        first = self.pool.acquire(mock.Mock, mock.Mock())
+        self.pool.acquire(mock.Mock, mock.Mock())
+
+        threading.Timer(0.05, self.pool.release, args=(first,)).start()
+
+        self.assertIs(self.pool.acquire(mock.Mock, mock.Mock()), first)
+        self.assertEqual(self.pool.stats()["in_use"], 2)
+
+    def test_old_connection_recycled(self):
+        raw = mock.Mock()
+        entry = self.pool.acquire(lambda: raw, mock.Mock())
+        self.pool.release(entry)
+        entry.created_at -= 61
+
+        self.assertIsNot(self.pool.acquire(mock.Mock, mock.Mock()).connection, raw)
+        raw.close.assert_called_once()
+        self.assertEqual(self.pool.stats()["recycled"], 1)
+
+    def test_idle_connection_health_checked(self):
+        entry = self.pool.acquire(mock.Mock, mock.Mock())
+        self.pool.release(entry)
+        entry.released_at -= 61
+        check = mock.Mock(side_effect=Exception("gone"))
+
+        self.assertIsNot(self.pool.acquire(mock.Mock, check), entry)
+        check.assert_called_once_with(entry.connection)
+        self.assertEqual(self.pool.stats()["health_check_failures"], 1)
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+
+    def test_failed_connect_frees_slot(self):
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.pool.acquire(mock.Mock(side_effect=RuntimeError), mock.Mock())
+
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.alias = f"pooled-{id(self)}"
+        self.databases_setting = {
+            "ENGINE": "core.db.backends.sqlite3",
+            "NAME": os.path.join(directory.name, "db.sqlite3"),
+            "POOL": {"MAX_SIZE": 1, "TIMEOUT": 0.05},
+        }
+        self.connections = self.create_handler()
+        self.connection = self.connections[self.alias]
+        self.addCleanup(self.connection.pool.close_idle)
+        self.addCleanup(self.connection.close)
+
+    def create_handler(self):
+        return ConnectionHandler(
+            {"default": self.databases_setting, self.alias: self.databases_setting}
+        )
+
+    def test_close_returns_connection_to_pool(self):
+        self.connection.ensure_connection()
+        raw = self.connection.connection
+        self.connection.close()
+
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+        self.assertIs(self.connection.connection, raw)
+        self.assertEqual(pool.pool_stats()[self.alias]["reused"], 1)
+
+    def test_connection_closed_in_transaction_not_reused(self):
+        self.connection.ensure_connection()
+        raw = self.connection.connection
+        self.connection.in_atomic_block = True
+        self.connection.close()
+
+        self.connection.connect()
+
+        self.assertIsNot(self.connection.connection, raw)
+        self.assertEqual(pool.pool_stats()[self.alias]["discarded"], 1)
+
+    def test_exhausted_pool_raises_operational_error(self):
+        self.connection.ensure_connection()
+        other = self.create_handler()[self.alias]
+
+        with self.assertRaises(OperationalError):
+            other.ensure_connection()
+
+
+class DatabasePoolStatsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = helpers.create_user(email="test@example.com")
+
+    def test_pool_stats_requires_staff(self):
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(reverse("metrics-db-pool"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pool_stats(self):
+        self.user.is_staff = True
+        self.client.force_authenticate(user=self.user)
+
+        with mock.patch("core.view.pool_stats", return_value={"default": {}}):
+            res = self.client.get(reverse("metrics-db-pool"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"default": {}})
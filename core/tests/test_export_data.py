@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import models
+from core.tests import helpers
+
+
+class ExportDataCommandTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+        helpers.create_comment(self.post, "first", self.user)
+        helpers.create_comment(self.post, "second", self.user)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, *args, filename="export"):
+        path = os.path.join(self.directory.name, filename)
+        call_command("export_data", *args, "--output", path, stderr=io.StringIO())
+        return path
+
+    def test_export_posts_of_user_as_ndjson(self):
+        path = self.export("posts", "--user", str(self.user.id))
+
+        with open(path, "rb") as export:
+            rows = [json.loads(line) for line in export]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["id"], self.post.id)
+        self.assertEqual(rows[0]["content"], "testcontent")
+
+    def test_export_comments_of_post_as_gzip_csv(self):
+        path = self.export(
+            "comments", "--post", str(self.post.id), "--format", "csv", "--gzip"
+        )
+
+        with gzip.open(path, "rt", newline="") as export:
+            rows = list(csv.DictReader(export))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["post"], str(self.post.id))
+
+    def test_export_reads_keyset_chunks(self):
+        helpers.create_comment(self.post, "third", self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            path = self.export("comments", "--chunk-size", "2")
+
+        with open(path, "rb") as export:
+            rows = [json.loads(line) for line in export]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            list(models.Comment.objects.order_by("pk").values_list("pk", flat=True)),
+        )
+        selects = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(len(selects), 4)
+        self.assertTrue(all("LIMIT 2" in sql for sql in selects[::2]))
+        self.assertIn('"core_comment"."id" > ', selects[2])
@@ -0,0 +1,126 @@
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import hashing
+from core.tests import helpers
+
+
+def occupy(pool, release: threading.Event) -> list:
+    """Fill every worker of a ``pool`` without queue with calls blocking until ``release`` is set."""
+    started = threading.Semaphore(0)
+
+    def block():
+        started.release()
+        release.wait()
+
+    threads = [
+        threading.Thread(target=pool.run, args=(block,))
+        for _ in range(pool.max_workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        started.acquire()
+    return threads
+
+
+class HashingPoolTests(TestCase):
+    def setUp(self):
+        self.pool = hashing.HashingPool(max_workers=1, max_queued=0)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def occupy(self):
+        return occupy(self.pool, self.release)[0]
+
+    def test_run_returns_result(self):
+        self.assertEqual(self.pool.run(sum, [1, 2]), 3)
+
+    def test_run_raises_when_saturated(self):
+        thread = self.occupy()
+
+        with self.assertRaises(hashing.PasswordHashingUnavailable):
+            self.pool.run(sum, [1])
+
+        self.release.set()
+        thread.join()
+        self.assertEqual(self.pool.run(sum, [1]), 1)
+
+    def test_run_propagates_errors_and_frees_slot(self):
+        for _ in range(3):
+            with self.assertRaises(ZeroDivisionError):
+                self.pool.run(lambda: 1 / 0)
+
+
+class PasswordHashingApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = helpers.create_user(email="test@example.com", password="test123")
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def saturate(self):
+        """Fill the pool the views use, as concurrent logins on the other threads of a worker would."""
+        threads = occupy(hashing.pool, self.release)
+
+        def join():
+            self.release.set()
+            for thread in threads:
+                thread.join()
+
+        self.addCleanup(join)
+
+    def test_default_limits_below_server_threads(self):
+        self.assertLess(
+            settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE,
+            int(os.environ.get("GUNICORN_THREADS", 2)),
+        )
+
+    def test_login_saturated(self):
+        self.saturate()
+
+        res = self.client.post(
+            reverse("user:login"),
+            {"email": "test@example.com", "password": "test123"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+    def test_register_saturated(self):
+        self.saturate()
+
+        res = self.client.post(
+            reverse("user:register"),
+            {"email": "new@example.com", "password": "test123", "name": "New"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(
+            type(self.user).objects.filter(email="new@example.com").exists()
+        )
+
+    @override_settings(
+        PASSWORD_HASHERS=[
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+    )
+    def test_login_upgrades_outdated_hash(self):
+        self.user.password = make_password("test123", hasher="md5")
+        self.user.save(update_fields=["password"])
+
+        res = self.client.post(
+            reverse("user:login"), {"email": "test@example.com", "password": "test123"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
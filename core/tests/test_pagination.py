@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core import counting, models
+from core.tests import helpers
+
+
+class CountStrategyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+
+    def test_cached_count_reuses_total(self):
+        strategy = counting.CachedCount()
+        queryset = models.Post.objects.filter(title="test")
+
+        self.assertEqual(strategy.count(queryset), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(strategy.count(queryset), 1)
+
+    def test_cached_count_invalidated_on_create_and_delete(self):
+        strategy = counting.CachedCount()
+        queryset = models.Post.objects.all()
+        self.assertEqual(strategy.count(queryset), 1)
+
+        post = models.Post.objects.create(
+            title="other", content="content", user=self.user
+        )
+        self.assertEqual(strategy.count(queryset), 2)
+
+        post.delete()
+        self.assertEqual(strategy.count(queryset), 1)
+
+    def test_cached_count_keyed_by_filter(self):
+        strategy = counting.CachedCount()
+
+        self.assertEqual(strategy.count(models.Post.objects.filter(title="test")), 1)
+        self.assertEqual(strategy.count(models.Post.objects.filter(title="none")), 0)
+
+    def test_estimated_count_falls_back_without_statistics(self):
+        strategy = counting.EstimatedCount()
+
+        self.assertEqual(strategy.count(models.Post.objects.all()), 1)
+
+    def test_denormalized_count_reads_post_counter(self):
+        models.Post.objects.filter(pk=self.post.id).update(like_count=7)
+        strategy = counting.DenormalizedCount("like_count", self.post.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(strategy.count(models.Like.objects.none()), 7)
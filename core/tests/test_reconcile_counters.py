@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import counters, models
+from core.tests import helpers
+
+
+class ReconcileCountersTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+        self.other = models.Post.objects.create(
+            title="other", content="x", user=self.user
+        )
+        helpers.create_like(post=self.post, user=self.user)
+        helpers.create_comment(self.post, "first", self.user)
+        helpers.create_comment(self.other, "second", self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, "checkpoint.json")
+
+    def reconcile(self, *args):
+        out = io.StringIO()
+        call_command("reconcile_counters", *args, "--chunk-size", "1", stdout=out)
+        return out.getvalue()
+
+    def counts(self, post):
+        post.refresh_from_db()
+        return post.like_count, post.comment_count
+
+    def test_drifted_counters_fixed(self):
+        models.Post.objects.filter(pk=self.post.pk).update(like_count=7)
+        models.Post.objects.filter(pk=self.other.pk).update(comment_count=-1)
+
+        output = self.reconcile()
+
+        self.assertIn("fixed 2 posts", output)
+        self.assertEqual(self.counts(self.post), (1, 1))
+        self.assertEqual(self.counts(self.other), (0, 1))
+
+    def test_consistent_posts_not_written(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(
+                counters.reconcile_range(self.post.pk, self.other.pk + 1), []
+            )
+
+        self.assertFalse(
+            [query for query in context.captured_queries if "UPDATE" in query["sql"]]
+        )
+
+    def test_resumes_from_checkpoint(self):
+        models.Post.objects.update(like_count=5)
+        with open(self.checkpoint, "w") as file:
+            json.dump({"next_id": self.other.pk}, file)
+
+        output = self.reconcile("--checkpoint", self.checkpoint)
+
+        self.assertIn(f"Resuming from post {self.other.pk}", output)
+        self.assertEqual(self.counts(self.post), (5, 1))
+        self.assertEqual(self.counts(self.other), (0, 1))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_restart_ignores_checkpoint(self):
+        models.Post.objects.update(like_count=5)
+        with open(self.checkpoint, "w") as file:
+            json.dump({"next_id": self.other.pk}, file)
+
+        self.reconcile("--checkpoint", self.checkpoint, "--restart")
+
+        self.assertEqual(self.counts(self.post), (1, 1))
+
+    def test_checkpoint_saved_after_each_range(self):
+        saved = []
+        reconcile_range = counters.reconcile_range
+
+        def record_checkpoint(low, high):
+            if os.path.exists(self.checkpoint):
+                with open(self.checkpoint) as file:
+                    saved.append(json.load(file)["next_id"])
+            return reconcile_range(low, high)
+
+        with mock.patch.object(counters, "reconcile_range", record_checkpoint):
+            self.reconcile("--checkpoint", self.checkpoint)
+
+        self.assertEqual(saved, list(range(self.post.pk + 1, self.other.pk + 1)))
@@ -0,0 +1,48 @@
+import datetime
+import decimal
+import io
+import uuid
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_renderer(self):
+        data = {
+            "created": timezone.make_aware(
+                datetime.datetime(2024, 1, 2, 3, 4, 5, 678901)
+            ),
+            "day": datetime.date(2024, 1, 2),
+            "price": decimal.Decimal("1.50"),
+            "uuid": uuid.UUID(int=1),
+            "text": "olá \u2028\u2029",
+            "items": [1, None, True],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_falls_back(self):
+        rendered = FastJSONRenderer().render({"a": 1}, "application/json; indent=2")
+
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_render_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse(self):
+        stream = io.BytesIO('{"title": "olá", "ids": [1, 2]}'.encode())
+
+        self.assertEqual(
+            FastJSONParser().parse(stream), {"title": "olá", "ids": [1, 2]}
+        )
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b"{invalid"))
@@ -0,0 +1,231 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import caching, checks, models, routers
+from core.middleware import ReplicaRoutingMiddleware
+from core.tests import helpers
+
+REPLICAS = ["replica1", "replica2"]
+
+
+@override_settings(REPLICA_DATABASES=REPLICAS, REPLICA_PIN_SECONDS=60)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+        self.user = mock.Mock(pk=1, is_authenticated=True)
+        healthy = mock.patch.object(
+            routers.replica_health, "is_healthy", side_effect=lambda alias: True
+        )
+        self.is_healthy = healthy.start()
+        self.addCleanup(healthy.stop)
+        self.addCleanup(cache.clear)
+
+    def route(self, method="get", user=None, status_code=200):
+        """Serve a request through the middleware and return where its view reads a Post from."""
+        routed = []
+
+        def view(request):
+            if user is not None:
+                request.user = user
+            routed.append(self.router.db_for_read(models.Post))
+            return HttpResponse(status=status_code)
+
+        ReplicaRoutingMiddleware(view)(getattr(self.factory, method)("/api/post/"))
+        return routed[0]
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertIn(self.route(user=self.user), REPLICAS)
+
+    def test_unsafe_request_reads_from_primary(self):
+        self.assertEqual(self.route("post", user=self.user), DEFAULT_DB_ALIAS)
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(self.router.db_for_read(models.Post), DEFAULT_DB_ALIAS)
+
+    def test_writes_use_primary(self):
+        self.assertEqual(self.router.db_for_write(models.Post), DEFAULT_DB_ALIAS)
+
+    def test_writer_pinned_to_primary(self):
+        self.route("post", user=self.user, status_code=201)
+
+        self.assertEqual(self.route(user=self.user), DEFAULT_DB_ALIAS)
+        other = mock.Mock(pk=2, is_authenticated=True)
+        self.assertIn(self.route(user=other), REPLICAS)
+
+    def test_failed_write_does_not_pin(self):
+        self.route("post", user=self.user, status_code=400)
+
+        self.assertIn(self.route(user=self.user), REPLICAS)
+
+    def test_anonymous_write_does_not_pin(self):
+        self.route("post", user=AnonymousUser(), status_code=201)
+
+        self.assertEqual(cache.get(routers.pin_key(None)), None)
+
+    def test_unhealthy_replicas_skipped(self):
+        self.is_healthy.side_effect = lambda alias: alias == "replica2"
+        self.assertEqual(self.route(user=self.user), "replica2")
+
+        self.is_healthy.side_effect = lambda alias: False
+        self.assertEqual(self.route(user=self.user), DEFAULT_DB_ALIAS)
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, "core"))
+        self.assertFalse(self.router.allow_migrate("replica1", "core"))
+
+
+@override_settings(REPLICA_MAX_LAG=2, REPLICA_HEALTH_CHECK_INTERVAL=60)
+class ReplicaHealthTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database = {"ENGINE": "django.db.backends.sqlite3"}
+        handler = ConnectionHandler(
+            {
+                "default": {**database, "NAME": os.path.join(directory.name, "a")},
+                "replica1": {**database, "NAME": os.path.join(directory.name, "b")},
+                "replica2": {
+                    **database,
+                    "NAME": os.path.join(directory.name, "missing", "c"),
+                },
+            }
+        )
+        patcher = mock.patch.object(routers, "connections", handler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(handler.close_all)
+        self.health = routers.ReplicaHealth()
+
+    def test_reachable_replica_healthy(self):
+        self.assertTrue(self.health.is_healthy("replica1"))
+
+    def test_unreachable_replica_unhealthy(self):
+        self.assertFalse(self.health.is_healthy("replica2"))
+
+    def test_lagging_replica_unhealthy(self):
+        with mock.patch.object(routers, "measure_lag", return_value=5):
+            self.assertFalse(self.health.is_healthy("replica1"))
+
+    def test_stopped_replication_unhealthy(self):
+        with mock.patch.object(routers, "measure_lag", return_value=None):
+            self.assertFalse(self.health.is_healthy("replica1"))
+
+    def test_health_checked_once_per_interval(self):
+        with mock.patch.object(routers, "measure_lag", return_value=0) as measure:
+            self.health.is_healthy("replica1")
+            self.health.is_healthy("replica1")
+
+        measure.assert_called_once()
+
+
+class ReadYourWritesApiTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.post.user)
+        self.addCleanup(cache.clear)
+
+    def test_like_pins_user_to_primary(self):
+        self.client.post(reverse("like:like-list"), {"post": self.post.id})
+
+        self.assertTrue(routers.is_pinned(self.post.user.pk))
+
+    def test_profile_update_pins_user_to_primary(self):
+        self.client.patch(reverse("user:me"), {"name": "New"})
+
+        self.assertTrue(routers.is_pinned(self.post.user.pk))
+
+    def test_read_does_not_pin(self):
+        self.client.get(reverse("post:post-list"))
+
+        self.assertFalse(routers.is_pinned(self.post.user.pk))
+
+
+@override_settings(
+    REPLICA_DATABASES=REPLICAS, REPLICA_MAX_LAG=2, REPLICA_HEALTH_CHECK_INTERVAL=5
+)
+class FreshVersionApiTests(TransactionTestCase):
+    # Reads inside a transaction always use the primary, so the test cannot run in one.
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.client = APIClient()
+        self.client.force_authenticate(user=helpers.create_user(email="r@example.com"))
+        self.addCleanup(cache.clear)
+
+        # Record where reads would go, but serve them all from the test database.
+        self.routed = []
+        reads_from_replica = routers.ReplicaRouter.reads_from_replica
+
+        def record(request):
+            self.routed.append(reads_from_replica(request))
+            return False
+
+        patcher = mock.patch.object(
+            routers.ReplicaRouter, "reads_from_replica", side_effect=record
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def age_versions(self, *keys):
+        cache.set_many({f"modified:{key}": 0 for key in keys}, None)
+
+    def test_read_after_bump_uses_primary(self):
+        url = reverse("post:post-detail", kwargs={"pk": self.post.id})
+        caching.invalidate_posts([self.post.id])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(self.routed)
+        self.assertNotIn(True, self.routed)
+
+    def test_read_of_settled_version_uses_replica(self):
+        url = reverse("post:post-detail", kwargs={"pk": self.post.id})
+        caching.invalidate_posts([self.post.id])
+        self.age_versions(caching.object_key(models.Post, self.post.id))
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(True, self.routed)
+
+
+class ReplicaCacheCheckTests(SimpleTestCase):
+    locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    shared = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": "127.0.0.1:11211",
+        }
+    }
+
+    def test_replicas_with_process_local_cache(self):
+        with self.settings(REPLICA_DATABASES=REPLICAS, CACHES=self.locmem):
+            errors = checks.check_replica_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+
+    def test_replicas_with_shared_cache(self):
+        with self.settings(REPLICA_DATABASES=REPLICAS, CACHES=self.shared):
+            self.assertEqual(checks.check_replica_cache(None), [])
+
+    def test_process_local_cache_without_replicas(self):
+        with self.settings(REPLICA_DATABASES=[], CACHES=self.locmem):
+            self.assertEqual(checks.check_replica_cache(None), [])
@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from core import models, search
+from core.tests import helpers
+
+
+class InvertedIndexTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="Hello World", content="hello again")
+
+    def test_tokenize(self):
+        self.assertEqual(
+            search.tokenize("Hello, World! a b café"), ["hello", "world", "café"]
+        )
+
+    def test_post_indexed_on_create(self):
+        terms = dict(
+            models.PostSearchTerm.objects.filter(post=self.post).values_list(
+                "term", "frequency"
+            )
+        )
+
+        self.assertEqual(terms, {"hello": 2, "world": 1, "again": 1})
+
+    def test_index_untouched_by_counter_updates(self):
+        models.PostSearchTerm.objects.filter(post=self.post).delete()
+
+        helpers.create_like(post=self.post, user=self.post.user)
+
+        self.assertFalse(models.PostSearchTerm.objects.filter(post=self.post).exists())
+
+    def test_search_without_terms_returns_nothing(self):
+        self.assertFalse(search.search_posts(models.Post.objects.all(), "a !").exists())
+
+    def test_empty_results_can_be_ordered_by_rank(self):
+        for query in ("a !", "zebra"):
+            with self.subTest(query=query):
+                results = search.search_posts(models.Post.objects.all(), query)
+
+                self.assertEqual(list(results.order_by("-rank", "-id")), [])
+
+    def test_bm25_prefers_rare_terms(self):
+        common = models.Post.objects.create(
+            title="hello", content="hello hello", user=self.post.user
+        )
+        rare = models.Post.objects.create(
+            title="zebra", content="hello", user=self.post.user
+        )
+
+        ranked = list(
+            search.search_posts(models.Post.objects.all(), "hello zebra")
+            .order_by("-rank")
+            .values_list("id", flat=True)
+        )
+
+        self.assertEqual(ranked[0], rare.id)
+        self.assertCountEqual(ranked, [self.post.id, common.id, rare.id])
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from comment.serializers import CommentModelSerializer
+from core import models
+from core.serializers import FastListSerializer
+from core.tests import helpers
+from like.serializers import LikeModelSerializer
+from post.serializers import PostModelSerializer
+
+
+class FastListSerializerTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        self.user = self.post.user
+        models.Post.objects.create(title="other", content="", user=self.user)
+        helpers.create_like(post=self.post, user=self.user)
+        helpers.create_comment(self.post, "content", self.user)
+
+    def assert_same_output(self, serializer_class, queryset, field_names=None):
+        fast = FastListSerializer.for_serializer(serializer_class, field_names)
+        rows = queryset.values_list(*fast.paths, named=True)
+        context = {"fields": field_names}
+
+        self.assertEqual(
+            fast.serialize(rows),
+            serializer_class(queryset, many=True, context=context).data,
+        )
+
+    def test_post_output_matches_model_serializer(self):
+        self.assert_same_output(
+            PostModelSerializer,
+            models.Post.objects.with_viewer_flags(self.user).order_by("-id"),
+        )
+
+    def test_like_output_matches_model_serializer(self):
+        self.assert_same_output(LikeModelSerializer, models.Like.objects.all())
+
+    def test_comment_output_matches_model_serializer(self):
+        self.assert_same_output(CommentModelSerializer, models.Comment.objects.all())
+
+    def test_sparse_output_matches_model_serializer(self):
+        self.assert_same_output(
+            PostModelSerializer,
+            models.Post.objects.order_by("-id"),
+            frozenset({"username", "created_datetime"}),
+        )
+
+    def test_extra_paths_not_rendered(self):
+        fast = FastListSerializer.for_serializer(
+            PostModelSerializer, {"title"}, extra_paths=["created_datetime", "id"]
+        )
+
+        self.assertEqual(fast.paths, ("title", "created_datetime", "id"))
+        rows = models.Post.objects.order_by("id").values_list(*fast.paths, named=True)
+        self.assertEqual(fast.serialize(rows), [{"title": "test"}, {"title": "other"}])
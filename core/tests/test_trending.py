@@ -0,0 +1,75 @@
+from django.test import TestCase
+
+from core import models, trending
+from core.tests import helpers
+
+HOUR = trending.WINDOWS["1h"]
+NOW = 100 * trending.ROLLOVER * HOUR + HOUR
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        self.user = helpers.create_user(email="test@example.com")
+        self.posts = [
+            models.Post.objects.create(title=f"t{index}", content="c", user=self.user)
+            for index in range(3)
+        ]
+        self.ids = [post.id for post in self.posts]
+
+    def test_more_events_rank_higher(self):
+        trending.record({self.ids[0]: 1, self.ids[1]: 3, self.ids[2]: 2}, now=NOW)
+
+        self.assertEqual(
+            trending.top_post_ids("1h", 10, now=NOW),
+            [self.ids[1], self.ids[2], self.ids[0]],
+        )
+
+    def test_recent_events_outrank_older_ones(self):
+        trending.record({self.ids[0]: 5}, now=NOW)
+        trending.record({self.ids[1]: 1}, now=NOW + 2 * HOUR)
+
+        self.assertEqual(
+            trending.top_post_ids("1h", 10, now=NOW + 2 * HOUR),
+            [self.ids[1], self.ids[0]],
+        )
+        self.assertEqual(
+            trending.top_post_ids("7d", 10, now=NOW + 2 * HOUR),
+            [self.ids[0], self.ids[1]],
+        )
+
+    def test_limit(self):
+        trending.record({self.ids[0]: 1, self.ids[1]: 3, self.ids[2]: 2}, now=NOW)
+
+        self.assertEqual(trending.top_post_ids("24h", 1, now=NOW), [self.ids[1]])
+
+    def test_negative_weight_undoes_event(self):
+        trending.record({self.ids[0]: 1, self.ids[1]: 2}, now=NOW)
+        trending.record({self.ids[1]: -2, self.ids[2]: -1}, now=NOW)
+
+        self.assertEqual(trending.top_post_ids("1h", 10, now=NOW), [self.ids[0]])
+        self.assertFalse(models.TrendingScore.objects.filter(post_id=self.ids[2]))
+
+    def test_rows_from_previous_base_ranked_and_rescaled(self):
+        rollover = trending.ROLLOVER * HOUR
+        trending.record({self.ids[0]: 1}, now=NOW + rollover - HOUR)
+        trending.record({self.ids[1]: 1}, now=NOW + rollover + HOUR)
+
+        self.assertEqual(
+            trending.top_post_ids("1h", 10, now=NOW + rollover + HOUR),
+            [self.ids[1], self.ids[0]],
+        )
+
+        trending.record({self.ids[0]: 1}, now=NOW + rollover + HOUR)
+        score = models.TrendingScore.objects.get(post_id=self.ids[0], window="1h")
+        self.assertEqual(score.base, trending.get_base("1h", NOW + rollover))
+
+    def test_old_rows_pruned(self):
+        trending.record({self.ids[0]: 1}, now=NOW)
+        trending.record({self.ids[1]: 1}, now=NOW + 2 * trending.ROLLOVER * HOUR)
+
+        self.assertFalse(
+            models.TrendingScore.objects.filter(post_id=self.ids[0], window="1h")
+        )
+        self.assertTrue(
+            models.TrendingScore.objects.filter(post_id=self.ids[0], window="7d")
+        )
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase
+
+from core import warmup
+from core.db import pool
+from core.serializers import _compile
+from post.serializers import PostModelSerializer
+from post.views import PostModelViewSet
+
+
+class WarmupTests(TestCase):
+    def test_warmup_runs_every_step(self):
+        timings = warmup.warmup()
+
+        self.assertEqual(
+            set(timings), {"connect_databases", "resolve_urls", "prime_serializers"}
+        )
+
+    def test_prime_serializers_compiles_fast_list_serializers(self):
+        _compile.cache_clear()
+
+        primed = warmup.prime_serializers()
+
+        self.assertIn(PostModelSerializer, primed)
+        self.assertGreater(_compile.cache_info().currsize, 0)
+
+    def test_iter_views_finds_routed_viewsets(self):
+        views = set(warmup.iter_views(warmup.resolve_urls().url_patterns))
+
+        self.assertIn(PostModelViewSet, views)
+
+    def test_failing_step_does_not_stop_warmup(self):
+        with mock.patch.object(
+            connection, "ensure_connection", side_effect=RuntimeError
+        ), self.assertLogs("core.warmup", level="ERROR"):
+            timings = warmup.warmup()
+
+        self.assertIn("prime_serializers", timings)
+
+
+class WarmupConnectionTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.alias = f"warmup-{id(self)}"
+        database = {
+            "ENGINE": "core.db.backends.sqlite3",
+            "NAME": os.path.join(directory.name, "db.sqlite3"),
+            "POOL": {"MAX_SIZE": 1, "TIMEOUT": 0.05},
+        }
+        self.connections = ConnectionHandler(
+            {"default": database, self.alias: database}
+        )
+        patcher = mock.patch.object(warmup, "connections", self.connections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.connections.close_all)
+
+    def test_request_thread_reuses_warm_connection(self):
+        warmup.connect_databases()
+        self.addCleanup(self.connections[self.alias].pool.close_idle)
+        errors = []
+
+        def serve_request():
+            # Connections are per thread, like the request threads of a gthread worker.
+            try:
+                with self.connections[self.alias].cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                self.connections[self.alias].close()
+
+        thread = threading.Thread(target=serve_request)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(errors, [])
+        stats = pool.pool_stats()[self.alias]
+        self.assertEqual((stats["created"], stats["reused"]), (1, 1))
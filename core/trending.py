@@ -0,0 +1,121 @@
+"""
+Trending posts, ranked by likes and comments with exponential time decay.
+
+An event of weight ``w`` at time ``t`` adds ``w * exp((t - base) / tau)`` to the post's ``TrendingScore`` of each
+window, where ``tau`` is the window length and ``base`` a recent reference time. Adding a growing amount instead of
+decaying every stored score keeps the scores comparable with each other, so the ranking is an index range scan on
+``(window, base, -score)`` and an event only inserts the missing rows and runs one ``UPDATE``.
+
+``base`` moves forward every ``ROLLOVER`` window lengths to keep the numbers small. A row is rescaled to the new
+base the next time it is updated, and rows older than the previous base have decayed to nothing and are pruned.
+"""
+
+import math
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.db.models.functions import Exp, Greatest
+
+from core import models
+
+WINDOWS = {"1h": 3600, "24h": 24 * 3600, "7d": 7 * 24 * 3600}
+DEFAULT_WINDOW = "24h"
+# Weight of an event, by the post counter it changes.
+WEIGHTS = {"like_count": 1.0, "comment_count": 2.0}
+# Window lengths between two bases; scores stay below exp(ROLLOVER) per event.
+ROLLOVER = 20
+
+
+def get_base(window: str, now: float) -> int:
+    period = ROLLOVER * WINDOWS[window]
+    return int(now // period * period)
+
+
+def _rescaled(window: str, base: int):
+    """Expression for the stored score of a ``window`` row expressed relative to ``base``."""
+    return F("score") * Exp((F("base") - base) / Value(float(WINDOWS[window])))
+
+
+def record(deltas: dict, now: float = None):
+    """
+    Add weighted events to the trending scores of posts, negative weights undo them.
+
+    Posts with the same weight are updated with one ``UPDATE`` for all windows.
+
+    :param deltas: Mapping of post id to the total weight of its events
+    :param now: Time of the events, defaults to the current time
+    """
+    deltas = {post_id: weight for post_id, weight in deltas.items() if weight}
+    if not deltas:
+        return
+    now = time.time() if now is None else now
+    bases = {window: get_base(window, now) for window in WINDOWS}
+
+    for window, base in bases.items():
+        if cache.add(
+            f"trending:pruned:{window}:{base}", True, ROLLOVER * WINDOWS[window]
+        ):
+            prune(window, base)
+
+    positive = [post_id for post_id, weight in deltas.items() if weight > 0]
+    if positive:
+        models.TrendingScore.objects.bulk_create(
+            [
+                models.TrendingScore(post_id=post_id, window=window, base=base, score=0)
+                for post_id in positive
+                for window, base in bases.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    by_weight = defaultdict(list)
+    for post_id, weight in deltas.items():
+        by_weight[weight].append(post_id)
+
+    for weight, post_ids in by_weight.items():
+        scores, new_bases = [], []
+        for window, base in bases.items():
+            contribution = Value(weight * math.exp((now - base) / WINDOWS[window]))
+            score = _rescaled(window, base) + contribution
+            if weight < 0:
+                score = Greatest(score, Value(0.0))
+            scores.append(When(window=window, then=score))
+            new_bases.append(When(window=window, then=Value(base)))
+
+        models.TrendingScore.objects.filter(post_id__in=post_ids).update(
+            score=Case(*scores, output_field=FloatField()),
+            base=Case(*new_bases, output_field=IntegerField()),
+        )
+
+
+def prune(window: str, base: int):
+    """Drop the rows of ``window`` not updated since before the previous base, their scores are negligible."""
+    previous = base - ROLLOVER * WINDOWS[window]
+    models.TrendingScore.objects.filter(window=window, base__lt=previous).delete()
+
+
+def top_post_ids(window: str, limit: int, now: float = None) -> list:
+    """
+    Ids of the ``limit`` highest ranked posts of ``window``.
+
+    Rows still on the previous base are read with a second range scan and rescaled before merging.
+    """
+    now = time.time() if now is None else now
+    base = get_base(window, now)
+    previous = base - ROLLOVER * WINDOWS[window]
+
+    ranked = []
+    for row_base in (base, previous):
+        rows = models.TrendingScore.objects.filter(
+            window=window, base=row_base, score__gt=0
+        ).order_by("-score")[:limit]
+        scale = math.exp((row_base - base) / WINDOWS[window])
+        ranked += [
+            (score * scale, post_id)
+            for post_id, score in rows.values_list("post_id", "score")
+        ]
+
+    ranked.sort(reverse=True)
+    return [post_id for _, post_id in ranked[:limit]]
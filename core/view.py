@@ -1,17 +1,439 @@
+import hashlib
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core import caching, counters, counting, models, routers, streaming
+from core.db.pool import pool_stats
+from core.pagination import KeysetPagination
+from core.serializers import FastListSerializer, get_model_columns
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = "Not modified."
+    default_code = "not_modified"
 
 
 class BaseModelViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
+    # Ordering used when the client asks for cursor pagination (?pagination=cursor or ?cursor=...).
+    # It must end with a unique column so every row has a distinct position.
+    cursor_ordering = ("-id",)
+    cursor_pagination_class = KeysetPagination
+    count_strategy_class = counting.CachedCount
+    # Related objects the serializer reads, loaded with the rows instead of once per row.
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    sparse_fields_query_param = "fields"
+    # Serve list pages from values_list() rows through a compiled FastListSerializer when the serializer allows it.
+    fast_list_serializer = False
+    # Page sizes from which list pages are streamed in chunks instead of rendered in one buffer (or ?stream=true).
+    stream_page_size = 1000
+    # Field holding the request user on the rows (e.g. "follower"): only their own rows are served.
+    owner_field = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            request = getattr(self, "request", None)
+            if (
+                request is not None
+                and self.cursor_ordering
+                and self.cursor_pagination_class.is_requested(request)
+            ):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                return super().paginator
+        return self._paginator
+
+    @property
+    def vary_on_user(self) -> bool:
+        """Responses depend on the request user (e.g. ``liked_by_me``), so ETags and cached responses are per user."""
+        return self.owner_field is not None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related = self.select_related_fields
+
+        if self.owner_field is not None:
+            queryset = queryset.filter(**{self.owner_field: self.request.user.pk})
+
+        mapping = self.get_sparse_columns()
+        if mapping is not None:
+            columns, relations = mapping
+            columns |= {field.lstrip("-") for field in self.cursor_ordering}
+            select_related = [field for field in select_related if field in relations]
+            queryset = queryset.only(*columns)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def get_sparse_fields(self):
+        """
+        Field names requested with ``?fields=id,title`` on reads, ``None`` when every field is wanted.
+
+        Unknown or write-only names are rejected with a 400.
+        """
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+
+        self._sparse_fields = None
+        request = getattr(self, "request", None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+
+        raw = request.query_params.get(self.sparse_fields_query_param)
+        if not raw:
+            return None
+
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        readable = {
+            name
+            for name, field in self.get_serializer_class()().fields.items()
+            if not field.write_only
+        }
+        unknown = requested - readable
+        if unknown or not requested:
+            raise ValidationError(
+                {
+                    self.sparse_fields_query_param: [
+                        f"Unknown fields: {sorted(unknown)}. Choose from {sorted(readable)}."
+                    ]
+                }
+            )
+
+        self._sparse_fields = requested
+        return requested
+
+    def get_sparse_columns(self):
+        """Model columns needed to render the requested fields, so the others are never read from the database."""
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return None
+        return get_model_columns(self.get_serializer_class()(), fields)
+
+    def list(self, request, *args, **kwargs):
+        return self.get_list_response(self.filter_queryset(self.get_queryset()))
+
+    def get_list_response(self, queryset):
+        """Paginate and serialize ``queryset``, through the fast row serializer when it is enabled."""
+        fast = self.get_fast_list_serializer()
+        if fast is not None:
+            queryset = queryset.values_list(*fast.paths, named=True)
+
+        if self.should_stream():
+            serialize = fast.serialize if fast is not None else self._serialize_rows
+            response = self.get_streaming_response(queryset, serialize)
+            if response is not None:
+                return response
+
+        if fast is not None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(fast.serialize(page))
+            return Response(fast.serialize(queryset))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def should_stream(self) -> bool:
+        request = self.request
+        if getattr(request, "accepted_renderer", None) is None:
+            return False
+        if request.accepted_renderer.format != "json" or self.paginator is None:
+            return False
+        if request.query_params.get("stream") in ("1", "true"):
+            return True
+        return self.paginator.get_page_size(request) >= self.stream_page_size
+
+    def get_streaming_response(self, queryset, serialize):
+        """Stream the requested page as JSON, ``None`` when the paginator cannot stream it."""
+        prepared = self.paginator.prepare_stream(queryset, self.request, view=self)
+        if prepared is None:
+            return None
+
+        page, limit = prepared
+        return streaming.streaming_json_response(
+            streaming.stream_page(self.paginator, page, limit, serialize)
+        )
+
+    def get_export_response(self, queryset, filename: str):
+        """
+        Stream every row of ``queryset`` as NDJSON, in primary key order.
+
+        Unlike list pages there is no pagination: rows are read in keyset chunks and written as they come, so memory
+        stays constant whatever the number of rows.
+        """
+        serializer = FastListSerializer.for_serializer(self.get_serializer_class())
+        if serializer is not None:
+            queryset = queryset.values_list(*serializer.paths, named=True)
+            serialize = serializer.serialize
+        else:
+            serialize = self._serialize_rows
+
+        rows = streaming.iter_rows(queryset, serialize)
+        return streaming.ndjson_response(rows, filename)
+
+    def _serialize_rows(self, rows) -> list:
+        return self.get_serializer(rows, many=True).data
+
+    def get_fast_list_serializer(self):
+        if not self.fast_list_serializer:
+            return None
+        return FastListSerializer.for_serializer(
+            self.get_serializer_class(),
+            self.get_sparse_fields(),
+            extra_paths=[field.lstrip("-") for field in self.cursor_ordering],
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Answers conditional GETs before the handler runs.
+
+        The validators come from the version counters in ``core.caching``, so checking them never serializes the
+        body; a matching ``If-None-Match`` (or ``If-Modified-Since``) ends the request with a 304.
+        """
+        super().initial(request, *args, **kwargs)
+
+        self.etag = self.last_modified = None
+        if request.method not in ("GET", "HEAD"):
+            return
 
-    def create(self, request, *args, **kwargs):
-        data = request.data.copy()
-        data["user"] = request.user.id
-        serializer = self.get_serializer(data=data)
+        key = self.get_conditional_version_key()
+        if key is None:
+            return
+
+        version, modified = caching.get_version_info(key)
+        if routers.is_recent(modified):
+            # The body has to match the data the ETag promises, see ``core.routers``.
+            routers.use_primary(request)
+        params = sorted(request.query_params.lists())
+        accept = request.META.get("HTTP_ACCEPT", "")
+        viewer = request.user.pk if self.vary_on_user else ""
+        self.etag = quote_etag(
+            hashlib.md5(
+                f"{key}:{version}:{request.path}?{params}:{accept}:{viewer}".encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+        )
+        self.last_modified = int(modified)
+
+        conditional = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if (
+            conditional is not None
+            and conditional.status_code == status.HTTP_304_NOT_MODIFIED
+        ):
+            raise NotModified()
+
+    def get_conditional_version_key(self):
+        """
+        Version key (see ``core.caching``) that changes whenever the response of the current read action does.
+
+        ``None`` disables conditional GETs for the action.
+        """
+        model = self.queryset.model
+        if self.action == "list":
+            return caching.collection_key(model)
+        if self.action == "retrieve":
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            return caching.object_key(model, self.kwargs[lookup])
+        return None
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers=self._validators()
+            )
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in self._validators().items():
+                response[header] = value
+        return response
+
+    def _validators(self) -> dict:
+        headers = {}
+        if getattr(self, "etag", None):
+            headers["ETag"] = self.etag
+        if getattr(self, "last_modified", None):
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+    def get_count_strategy(self):
+        """Strategy ``CustomPagination`` uses to compute the ``count`` of a page, see ``core.counting``."""
+        return self.count_strategy_class()
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class BulkCreateMixin:
+    """
+    Adds ``POST <prefix>/bulk/``, creating a list of objects tied to posts in one transaction.
+
+    Rows are inserted with ``bulk_create`` and the post counter named by ``bulk_counter_field`` is adjusted with one
+    ``UPDATE`` per distinct increment instead of re-saving the post once per object. With ``bulk_unique_per_user``
+    a user has at most one object per post: repeated and already existing posts are skipped.
+
+    The response holds the number of objects ``created``. ``bulk_create`` does not return primary keys on MySQL, so
+    the objects are only listed in ``results`` when ``bulk_unique_per_user`` lets them be read back by
+    ``(user, post)``.
+    """
+
+    bulk_serializer_class = None
+    bulk_counter_field = None
+    bulk_unique_per_user = False
+    bulk_max_items = 500
+    bulk_batch_size = 100
+
+    @action(detail=False, methods=["post"], url_path="bulk", url_name="bulk")
+    def bulk_create(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError(
+                {
+                    "non_field_errors": [
+                        f"Ensure this list has no more than {self.bulk_max_items} items."
+                    ]
+                }
+            )
+
+        serializer = self.bulk_serializer_class(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
-        headers = self.get_success_headers(serializer.data)
-        return Response(
-            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        items = serializer.validated_data
+
+        post_ids = {item["post"] for item in items}
+        existing = set(
+            models.Post.objects.filter(pk__in=post_ids).values_list("pk", flat=True)
         )
+        missing = sorted(post_ids - existing)
+        if missing:
+            raise ValidationError({"post": [f"Invalid post ids: {missing}."]})
+
+        model = self.queryset.model
+        if self.bulk_unique_per_user:
+            items = self.drop_existing(model, request.user, items)
+        objects = [
+            model(
+                user=request.user,
+                post_id=item["post"],
+                **{key: value for key, value in item.items() if key != "post"},
+            )
+            for item in items
+        ]
+        increments = Counter(item["post"] for item in items)
+
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    objects, batch_size=self.bulk_batch_size
+                )
+                self.apply_counter_increments(increments)
+                transaction.on_commit(lambda: self.invalidate_bulk(model, increments))
+                data = {"created": len(created)}
+                if self.bulk_unique_per_user:
+                    created = self.read_created(model, request.user, items)
+                    data["results"] = self.get_serializer(created, many=True).data
+        except IntegrityError:
+            # A concurrent request created one of the objects; retrying skips it.
+            raise ValidationError(
+                {"non_field_errors": ["Some items were created concurrently, retry."]}
+            )
+
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def drop_existing(model, user, items) -> list:
+        """Keep the first item of each post the user has no object for yet."""
+        existing = set(
+            model.objects.filter(
+                user=user, post_id__in={item["post"] for item in items}
+            ).values_list("post_id", flat=True)
+        )
+        kept = {}
+        for item in items:
+            if item["post"] not in existing:
+                kept.setdefault(item["post"], item)
+        return list(kept.values())
+
+    @staticmethod
+    def read_created(model, user, items) -> list:
+        """The objects just created for ``items``, in their order, read back by ``(user, post)``."""
+        created = {
+            instance.post_id: instance
+            for instance in model.objects.filter(
+                user=user, post_id__in=[item["post"] for item in items]
+            )
+        }
+        return [created[item["post"]] for item in items]
+
+    def apply_counter_increments(self, increments: Counter):
+        counters.adjust(self.bulk_counter_field, increments)
+
+    @staticmethod
+    def invalidate_bulk(model, increments: Counter):
+        counting.invalidate_counts(sender=model)
+        caching.bump_version(caching.collection_key(model))
+        caching.invalidate_posts(increments)
+
+
+class PendingCountersMixin:
+    """
+    Adds the write-behind counter deltas not flushed yet (see ``core.counters``) to the posts of the response.
+
+    It runs after the response cache, so cached responses get current counters too. Streamed pages never have
+    ``data``, their deltas are merged chunk by chunk as the rows are serialized.
+    """
+
+    def get_streaming_response(self, queryset, serialize):
+        def serialize_with_pending(rows) -> list:
+            items = serialize(rows)
+            counters.merge_pending(items)
+            return items
+
+        return super().get_streaming_response(queryset, serialize_with_pending)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        data = getattr(response, "data", None)
+        if response.status_code == status.HTTP_200_OK and data:
+            if isinstance(data, dict):
+                counters.merge_pending(data.get("results", [data]))
+            else:
+                counters.merge_pending(data)
+        return response
+
+
+class DatabasePoolStatsView(APIView):
+    """Connection pool stats of the worker process serving the request, for metrics scraping."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(pool_stats())
@@ -0,0 +1,80 @@
+"""
+Per-process warmup, run by gunicorn's ``post_worker_init`` hook before a worker accepts requests.
+
+A cold worker pays for its first database connections, the URL resolver and the serializer field introspection
+on the first requests it serves. ``warmup`` does that work up front.
+"""
+
+import logging
+import time
+
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from core.serializers import FastListSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def iter_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            view = getattr(pattern.callback, "cls", None)
+            if view is not None:
+                yield view
+
+
+def connect_databases():
+    """
+    Open a connection to every database, then close it.
+
+    Django connections belong to the thread that opened them and requests are served by other threads (gthread),
+    so the warm connections are closed: the pooled backends hand them to the pool (see ``core.db.pool``), where
+    the request threads pick them up, instead of holding a pool slot for the life of the worker.
+    """
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        finally:
+            connection.close()
+
+
+def resolve_urls():
+    resolver = get_resolver()
+    # Building the reverse dict walks every include and compiles the route patterns.
+    resolver.reverse_dict
+    return resolver
+
+
+def prime_serializers():
+    primed = set()
+    for view in iter_views(get_resolver().url_patterns):
+        serializer_class = getattr(view, "serializer_class", None)
+        if serializer_class is None or serializer_class in primed:
+            continue
+        primed.add(serializer_class)
+        serializer_class().fields
+        if getattr(view, "fast_list_serializer", False):
+            FastListSerializer.for_serializer(serializer_class)
+    return primed
+
+
+def warmup() -> dict:
+    """
+    Open the database connections, load the URL resolver and build the serializers of every routed view.
+
+    A failing step is logged and skipped, so a worker still starts when e.g. the database is briefly unavailable.
+
+    :return: Seconds spent per step
+    """
+    timings = {}
+    for step in (connect_databases, resolve_urls, prime_serializers):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warmup step %s failed", step.__name__)
+        timings[step.__name__] = time.perf_counter() - start
+    return timings
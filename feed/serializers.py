@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from core import models
+from core.serializers import SparseFieldsetMixin
+
+
+class FollowModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = models.Follow
+        fields = ["id", "follower", "followee", "created_datetime"]
+        read_only_fields = ["id", "follower", "created_datetime"]
+
+    def validate_followee(self, followee):
+        follower = self.context["request"].user
+        if followee.pk == follower.pk:
+            raise serializers.ValidationError("You cannot follow yourself.")
+        if models.Follow.objects.filter(follower=follower, followee=followee).exists():
+            raise serializers.ValidationError("You already follow this user.")
+        return followee
@@ -0,0 +1,218 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+from core.tests import helpers
+
+FOLLOW_URL = reverse("feed:follow-list")
+FEED_URL = reverse("feed:feed-list")
+
+
+def follow_detail_url(follow_id):
+    return reverse("feed:follow-detail", kwargs={"pk": follow_id})
+
+
+class PublicFeedApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_retrieve_feed_unauthorized(self):
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateFeedApiTests(TestCase):
+    def setUp(self):
+        self.user = helpers.create_user(email="reader@example.com")
+        self.author = helpers.create_user(email="author@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def follow(self, author):
+        return models.Follow.objects.create(follower=self.user, followee=author)
+
+    def create_post(self, author, title="title"):
+        return models.Post.objects.create(title=title, content="content", user=author)
+
+    def feed_ids(self, **params):
+        res = self.client.get(FEED_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [post["id"] for post in res.data["results"]]
+
+    def test_follow_user(self):
+        res = self.client.post(FOLLOW_URL, {"followee": self.author.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["follower"], self.user.id)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 1)
+
+    def test_follow_self_or_twice_rejected(self):
+        self.follow(self.author)
+
+        for followee in (self.user, self.author):
+            res = self.client.post(FOLLOW_URL, {"followee": followee.id})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_own_follows(self):
+        follow = self.follow(self.author)
+        models.Follow.objects.create(follower=self.author, followee=self.user)
+
+        res = self.client.get(FOLLOW_URL)
+
+        self.assertEqual([item["id"] for item in res.data["results"]], [follow.id])
+
+    def test_follows_etag_not_shared_between_users(self):
+        follow = self.follow(self.author)
+        other = APIClient()
+        other.force_authenticate(user=self.author)
+
+        for url in (FOLLOW_URL, follow_detail_url(follow.id)):
+            etag = self.client.get(url)["ETag"]
+
+            res = other.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertNotEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+    def test_post_fanned_out_to_followers(self):
+        self.follow(self.author)
+        post = self.create_post(self.author)
+        other = self.create_post(helpers.create_user(email="other@example.com"))
+
+        self.assertEqual(self.feed_ids(), [post.id])
+        self.assertTrue(
+            models.TimelineEntry.objects.filter(user=self.author, post=post).exists()
+        )
+        self.assertFalse(
+            models.TimelineEntry.objects.filter(post=other, user=self.user)
+        )
+
+    def test_feed_includes_own_posts(self):
+        post = self.create_post(self.user)
+
+        self.assertEqual(self.feed_ids(), [post.id])
+
+    def test_feed_liked_and_commented_by_me(self):
+        self.follow(self.author)
+        liked = self.create_post(self.author, "liked")
+        commented = self.create_post(self.author, "commented")
+        helpers.create_like(post=liked, user=self.user)
+        helpers.create_comment(commented, "comment", self.user)
+
+        results = self.client.get(FEED_URL).data["results"]
+
+        flags = {
+            post["id"]: (post["liked_by_me"], post["commented_by_me"])
+            for post in results
+        }
+        self.assertEqual(flags, {liked.id: (True, False), commented.id: (False, True)})
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        posts = [self.create_post(self.author, f"title{index}") for index in range(3)]
+
+        follow = self.follow(self.author)
+        self.assertEqual(self.feed_ids(), [post.id for post in reversed(posts)])
+
+        res = self.client.delete(follow_detail_url(follow.id))
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.feed_ids(), [])
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 0)
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+    def test_large_author_merged_on_read(self):
+        popular = helpers.create_user(email="popular@example.com")
+        models.Follow.objects.create(follower=self.author, followee=popular)
+        self.follow(popular)
+        self.follow(self.author)
+        posts = [
+            self.create_post(popular, "popular1"),
+            self.create_post(self.author, "author"),
+            self.create_post(popular, "popular2"),
+        ]
+
+        self.assertFalse(
+            models.TimelineEntry.objects.filter(user=self.user, post__user=popular)
+        )
+        self.assertEqual(self.feed_ids(), [post.id for post in reversed(posts)])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+    def test_author_crossing_fanout_limit_both_ways(self):
+        self.follow(self.author)
+        fanned = self.create_post(self.author, "fanned")
+
+        other = models.Follow.objects.create(
+            follower=helpers.create_user(email="other@example.com"),
+            followee=self.author,
+        )
+        unfanned = self.create_post(self.author, "unfanned")
+        self.assertEqual(self.feed_ids(), [unfanned.id, fanned.id])
+
+        self.client.force_authenticate(user=other.follower)
+        self.client.delete(follow_detail_url(other.id))
+        self.client.force_authenticate(user=self.user)
+        resumed = self.create_post(self.author, "resumed")
+
+        self.assertTrue(
+            models.TimelineEntry.objects.filter(user=self.user, post=resumed)
+        )
+        self.assertFalse(
+            models.TimelineEntry.objects.filter(user=self.user, post=unfanned)
+        )
+        self.assertEqual(self.feed_ids(), [resumed.id, unfanned.id, fanned.id])
+
+    @override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+    def test_feed_keyset_pagination_across_sources(self):
+        popular = helpers.create_user(email="popular@example.com")
+        models.Follow.objects.create(follower=self.author, followee=popular)
+        self.follow(popular)
+        self.follow(self.author)
+        posts = [
+            self.create_post(popular if index % 2 else self.author, f"title{index}")
+            for index in range(5)
+        ]
+        expected = [post.id for post in reversed(posts)]
+
+        ids, cursor = [], None
+        while True:
+            params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+            res = self.client.get(FEED_URL, params)
+            ids += [post["id"] for post in res.data["results"]]
+            cursor = res.data["next"]
+            if cursor is None:
+                break
+        self.assertEqual(ids, expected)
+
+        res = self.client.get(
+            FEED_URL, {"cursor": res.data["previous"], "page_size": 2}
+        )
+        self.assertEqual([post["id"] for post in res.data["results"]], expected[2:4])
+
+    def test_feed_invalid_cursor(self):
+        res = self.client.get(FEED_URL, {"cursor": "bad"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_feed_tampered_cursor(self):
+        for cursor in helpers.tampered_cursors(2):
+            with self.subTest(cursor=cursor):
+                res = self.client.get(FEED_URL, {"cursor": cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_feed_query_budget(self):
+        self.follow(self.author)
+
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(FEED_URL, {"page_size": size}),
+            lambda size: [self.create_post(self.author) for _ in range(size)],
+        )
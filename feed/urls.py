@@ -0,0 +1,11 @@
+from rest_framework.routers import SimpleRouter
+
+from feed import views
+
+app_name = "feed"
+
+router = SimpleRouter()
+router.register(r"follow", views.FollowModelViewSet)
+router.register(r"feed", views.FeedViewSet, basename="feed")
+
+urlpatterns = router.urls
@@ -0,0 +1,33 @@
+from rest_framework import permissions, viewsets
+
+from core import feed, models
+from core.pagination import MergedKeysetPagination
+from core.view import BaseModelViewSet, PendingCountersMixin
+from feed import serializers
+from post.serializers import PostModelSerializer
+
+
+class FollowModelViewSet(BaseModelViewSet):
+    queryset = models.Follow.objects.all().order_by("-id")
+    serializer_class = serializers.FollowModelSerializer
+    http_method_names = ["get", "post", "delete"]
+    owner_field = "follower"
+
+    def perform_create(self, serializer):
+        serializer.save(follower=self.request.user)
+
+
+class FeedViewSet(PendingCountersMixin, viewsets.GenericViewSet):
+    """Posts of the users the request user follows and their own, newest first, with keyset pagination."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = PostModelSerializer
+    pagination_class = MergedKeysetPagination
+    cursor_ordering = ("-created_datetime", "-id")
+
+    def list(self, request):
+        page = self.paginator.paginate_sources(
+            feed.get_feed_sources(request.user.pk), request, self
+        )
+        feed.set_viewer_flags(page, request.user)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
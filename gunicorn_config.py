@@ -1,8 +1,55 @@
-bind = "0.0.0.0:8000"
+import multiprocessing
+import os
 
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
 
-loglevel = "debug"
+# GUNICORN_PROFILE=asgi serves app.asgi with uvicorn workers, so the async endpoints under /api/async/ run on the
+# event loop instead of tying up a sync worker while they wait on the database.
+profile = os.environ.get("GUNICORN_PROFILE", "wsgi")
+
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+
+if profile == "asgi":
+    wsgi_app = "app.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "app.wsgi:application"
+    threads = int(os.environ.get("GUNICORN_THREADS", 2))
+    worker_class = "gthread" if threads > 1 else "sync"
+
+# Import Django once in the master so workers share its memory copy-on-write.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Recycle workers to bound memory growth; the jitter keeps them from restarting all at once.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+loglevel = os.environ.get("GUNICORN_LOGLEVEL", "info")
 accesslog = "/var/log/gunicorn/access.log"
 errorlog = "/var/log/gunicorn/error.log"
 
 pidfile = "/var/run/gunicorn.pid"
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading belong to the master and must not be shared between workers.
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    from core.warmup import warmup
+
+    timings = warmup()
+    worker.log.info(
+        "Worker %s warmed up: %s",
+        worker.pid,
+        ", ".join(
+            f"{step} {seconds * 1000:.0f}ms" for step, seconds in timings.items()
+        ),
+    )
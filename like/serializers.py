@@ -1,10 +1,15 @@
 from rest_framework import serializers
 
 from core import models
+from core.serializers import SparseFieldsetMixin
 
 
-class LikeModelSerializer(serializers.ModelSerializer):
+class LikeModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = models.Like
         fields = ["id", "user", "post"]
-        read_only_fields = ["id"]
+        read_only_fields = ["id", "user"]
+
+
+class LikeBulkSerializer(serializers.Serializer):
+    post = serializers.IntegerField(min_value=1)
@@ -1,3 +1,7 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -5,6 +9,7 @@ from rest_framework.test import APIClient
 
 from core import models
 from core.tests import helpers
+from user.serializers import CustomTokenObtainPairSerializer
 
 BASE_LIKE_URL = reverse("like:like-list")
 
@@ -68,11 +73,23 @@ class PrivateLikeApiTests(TestCase):
         self.like = helpers.create_like(post=self.post, user=self.user)
 
     def test_create_like(self):
-        res = self.client.post(BASE_LIKE_URL, {"post": self.post.id}, format="json")
+        other_post = models.Post.objects.create(
+            title="other", content="content", user=self.user
+        )
+        res = self.client.post(BASE_LIKE_URL, {"post": other_post.id}, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        post = models.Post.objects.get(pk=self.post.id)
-        self.assertEqual(post.like_count, 2)
+        other_post.refresh_from_db()
+        self.assertEqual(other_post.like_count, 1)
+
+    def test_create_like_twice_is_idempotent(self):
+        res = self.client.post(BASE_LIKE_URL, {"post": self.post.id}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], self.like.id)
+        self.assertEqual(models.Like.objects.filter(user=self.user).count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
 
     def test_retrieve_like_counts(self):
         res = self.client.get(BASE_LIKE_URL)
@@ -96,3 +113,147 @@ class PrivateLikeApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["count"], 1)
         self.assertEqual(res.data["results"][0]["post"], self.post.id)
+
+    def test_retrieve_likes_by_post_id_with_cursor_pagination(self):
+        other_user = helpers.create_user(email="test3@example.com")
+        other_like = helpers.create_like(post=self.post, user=other_user)
+        url = like_list_by_post_url(self.post.id)
+
+        res = self.client.get(url, {"pagination": "cursor", "page_size": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["id"], other_like.id)
+
+        res = self.client.get(url, {"cursor": res.data["next"], "page_size": 1})
+
+        self.assertEqual(res.data["results"][0]["id"], self.like.id)
+        self.assertIsNone(res.data["next"])
+
+    def test_retrieve_likes_by_post_id_with_tampered_cursor(self):
+        url = like_list_by_post_url(self.post.id)
+
+        for cursor in helpers.tampered_cursors(1):
+            with self.subTest(cursor=cursor):
+                res = self.client.get(url, {"cursor": cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def _add_likes_by_new_users(self, size):
+        for index in range(size):
+            user = helpers.create_user(email=f"liker{size}-{index}@example.com")
+            helpers.create_like(post=self.post, user=user)
+
+    def test_list_likes_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(BASE_LIKE_URL, {"page_size": size}),
+            self._add_likes_by_new_users,
+        )
+
+    def test_list_likes_by_post_id_query_budget(self):
+        url = like_list_by_post_url(self.post.id)
+
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(url, {"page_size": size}),
+            self._add_likes_by_new_users,
+        )
+
+    def test_retrieve_like_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(detail_url(self.like.id)),
+            self._add_likes_by_new_users,
+        )
+
+    def test_bulk_create_likes(self):
+        other_post = models.Post.objects.create(
+            title="other", content="content", user=self.user
+        )
+        payload = [
+            {"post": self.post.id},
+            {"post": other_post.id},
+            {"post": other_post.id},
+        ]
+
+        res = self.client.post(reverse("like:like-bulk"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["results"][0]["post"], other_post.id)
+        self.assertEqual(
+            res.data["results"][0]["id"],
+            models.Like.objects.get(user=self.user, post=other_post).id,
+        )
+        self.assertEqual(models.Like.objects.filter(user=self.user).count(), 2)
+        self.post.refresh_from_db()
+        other_post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(other_post.like_count, 1)
+
+    def test_bulk_create_likes_ids_read_back(self):
+        posts = models.Post.objects.bulk_create(
+            models.Post(title=f"title{index}", content="content", user=self.user)
+            for index in range(3)
+        )
+        payload = [{"post": post.id} for post in reversed(posts)]
+
+        # Like MySQL, which returns no primary keys from a bulk insert.
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            res = self.client.post(reverse("like:like-bulk"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        likes = models.Like.objects.filter(user=self.user)
+        self.assertEqual(
+            [(like["id"], like["post"]) for like in res.data["results"]],
+            [(likes.get(post_id=item["post"]).id, item["post"]) for item in payload],
+        )
+
+    def test_bulk_create_likes_invalid_post(self):
+        payload = [{"post": self.post.id}, {"post": self.post.id + 1000}]
+
+        res = self.client.post(reverse("like:like-bulk"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(models.Like.objects.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+    def test_bulk_create_likes_requires_list(self):
+        res = self.client.post(
+            reverse("like:like-bulk"), {"post": self.post.id}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_likes_invalidates_cached_post(self):
+        other_post = models.Post.objects.create(
+            title="other", content="content", user=self.user
+        )
+        post_url = reverse("post:post-detail", kwargs={"pk": other_post.id})
+        self.client.get(post_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("like:like-bulk"), [{"post": other_post.id}], format="json"
+            )
+        res = self.client.get(post_url)
+
+        self.assertEqual(res.data["like_count"], 1)
+        self.assertTrue(res.data["liked_by_me"])
+
+    def test_async_retrieve_likes_by_post_id_matches_sync(self):
+        token = CustomTokenObtainPairSerializer.get_token(self.user).access_token
+        url = reverse("like:async-like-list-by-post", kwargs={"post_id": self.post.id})
+
+        res = async_to_sync(self.async_client.get)(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["count"], 1)
+        self.assertEqual(
+            res.json(), self.client.get(like_list_by_post_url(self.post.id)).json()
+        )
@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from like import views
@@ -7,4 +8,10 @@ app_name = "like"
 router = SimpleRouter()
 router.register(r"like", views.LikeModelViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/like/posts/<int:post_id>/",
+        views.async_likes_by_post_id,
+        name="async-like-list-by-post",
+    ),
+]
@@ -1,19 +1,48 @@
-from rest_framework import filters
+from rest_framework import filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from core import models
-from core.view import BaseModelViewSet
+from core import async_views, caching, counting, models
+from core.view import BaseModelViewSet, BulkCreateMixin
 from like import serializers
 
 
-class LikeModelViewSet(BaseModelViewSet):
+class LikeModelViewSet(BulkCreateMixin, BaseModelViewSet):
     queryset = models.Like.objects.all().order_by("-id")
     serializer_class = serializers.LikeModelSerializer
+    bulk_serializer_class = serializers.LikeBulkSerializer
+    bulk_counter_field = "like_count"
+    bulk_unique_per_user = True
     http_method_names = ["get", "post", "delete"]
+    fast_list_serializer = True
     filter_backends = [filters.SearchFilter]
     search_fields = ["=post_id"]
 
+    def create(self, request, *args, **kwargs):
+        """
+        Likes ``post`` for the request user. Liking a post again returns the existing like with a 200.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        like, created = models.Like.objects.get_or_create(
+            user=request.user, post=serializer.validated_data["post"]
+        )
+
+        return Response(
+            self.get_serializer(like).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def get_count_strategy(self):
+        if self.action == "get_likes_by_post_id":
+            return counting.DenormalizedCount("like_count", self.kwargs["post_id"])
+        return super().get_count_strategy()
+
+    def get_conditional_version_key(self):
+        if self.action == "get_likes_by_post_id":
+            return caching.object_key(models.Post, self.kwargs["post_id"])
+        return super().get_conditional_version_key()
+
     @action(
         detail=False,
         methods=["get"],
@@ -22,11 +51,29 @@ class LikeModelViewSet(BaseModelViewSet):
     )
     def get_likes_by_post_id(self, request, post_id: int):
         queryset = self.get_queryset().filter(post_id=post_id)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, many=True)
+        return self.get_list_response(queryset)
 
-        return Response(serializer.data)
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="posts/(?P<post_id>[^/.]+)/export",
+        url_name="export-by-post",
+    )
+    def export_likes_by_post_id(self, request, post_id: int):
+        queryset = self.get_queryset().filter(post_id=post_id)
+
+        return self.get_export_response(queryset, f"likes-post-{post_id}.ndjson")
+
+
+@async_views.async_api_view
+async def async_likes_by_post_id(request, post_id: int):
+    queryset = models.Like.objects.filter(post_id=post_id).order_by("-id")
+    return async_views.json_response(
+        await async_views.paginate(
+            request,
+            queryset,
+            serializers.LikeModelSerializer,
+            counting.DenormalizedCount("like_count", post_id),
+        )
+    )
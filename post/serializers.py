@@ -1,14 +1,19 @@
 from rest_framework import serializers
 
 from core import models
+from core.serializers import SparseFieldsetMixin
 
 
-class PostModelSerializer(serializers.ModelSerializer):
+class PostModelSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     username = serializers.SlugRelatedField(
         source="user",
         slug_field="username",
         read_only=True,
     )
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    # Annotated by ``PostQuerySet.with_viewer_flags``; posts created by the request are neither liked nor commented.
+    liked_by_me = serializers.BooleanField(read_only=True, default=False)
+    commented_by_me = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = models.Post
@@ -21,7 +26,10 @@ class PostModelSerializer(serializers.ModelSerializer):
             "created_datetime",
             "like_count",
             "comment_count",
+            "liked_by_me",
+            "commented_by_me",
         ]
+        annotated_fields = ["liked_by_me", "commented_by_me"]
         read_only_fields = [
             "created_datetime",
             "id",
@@ -29,4 +37,3 @@ class PostModelSerializer(serializers.ModelSerializer):
             "like_count",
             "comment_count",
         ]
-        extra_kwargs = {"user": {"write_only": True}}
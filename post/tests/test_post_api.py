@@ -1,10 +1,18 @@
+import json
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core import models
+from core import counting, models
 from core.tests import helpers
+from user.serializers import CustomTokenObtainPairSerializer
 
 BASE_POST_URL = reverse("post:post-list")
 
@@ -99,3 +107,577 @@ class PrivatePostApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
 
         self.assertEqual(models.Post.objects.count(), 0)
+
+    def _add_posts(self, total):
+        models.Post.objects.bulk_create(
+            models.Post(title=f"title{index}", content="content", user=self.user)
+            for index in range(total)
+        )
+
+    def test_low_estimated_count_does_not_hide_pages(self):
+        self._add_posts(24)
+
+        for estimate in (0, 12):
+            with mock.patch.object(
+                counting.EstimatedCount, "get_estimate", return_value=estimate
+            ):
+                seen = []
+                params = {"page_size": 10, "page": 1}
+                while params["page"]:
+                    res = self.client.get(BASE_POST_URL, params)
+                    self.assertEqual(res.status_code, status.HTTP_200_OK)
+                    seen.extend(post["id"] for post in res.data["results"])
+                    params["page"] = res.data["next"]
+
+                self.assertEqual(len(set(seen)), 25)
+                self.assertEqual(res.data["count"], 25)
+                res = self.client.get(BASE_POST_URL, {"page_size": 10, "page": 4})
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_estimated_count_displayed_on_inner_pages(self):
+        self._add_posts(24)
+
+        with mock.patch.object(
+            counting.EstimatedCount, "get_estimate", return_value=12
+        ):
+            res = self.client.get(BASE_POST_URL, {"page_size": 10, "page": 1})
+            self.assertEqual(res.data["count"], 12)
+            res = self.client.get(BASE_POST_URL, {"page_size": 10, "page": 2})
+            self.assertEqual(res.data["count"], 21)
+            res = self.client.get(
+                BASE_POST_URL, {"page_size": 10, "page": 3, "stream": "1"}
+            )
+            body = json.loads(b"".join(res.streaming_content))
+            self.assertEqual((len(body["results"]), body["count"]), (5, 25))
+            res = self.client.get(
+                BASE_POST_URL, {"page_size": 10, "page": 4, "stream": "1"}
+            )
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_posts_with_cursor_pagination(self):
+        for index in range(4):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.user
+            )
+        expected = list(
+            models.Post.objects.order_by("-created_datetime", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        res = self.client.get(BASE_POST_URL, {"pagination": "cursor", "page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+        seen = [post["id"] for post in res.data["results"]]
+
+        while res.data["next"]:
+            res = self.client.get(
+                BASE_POST_URL, {"cursor": res.data["next"], "page_size": 2}
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen.extend(post["id"] for post in res.data["results"])
+
+        self.assertEqual(seen, expected)
+
+        res = self.client.get(
+            BASE_POST_URL, {"cursor": res.data["previous"], "page_size": 2}
+        )
+
+        self.assertEqual([post["id"] for post in res.data["results"]], expected[2:4])
+        self.assertIsNotNone(res.data["next"])
+
+    def test_retrieve_posts_with_invalid_cursor(self):
+        res = self.client.get(BASE_POST_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_posts_with_tampered_cursor(self):
+        for cursor in helpers.tampered_cursors(2):
+            with self.subTest(cursor=cursor):
+                res = self.client.get(BASE_POST_URL, {"cursor": cursor})
+
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertEqual(res.data["detail"], "Invalid cursor")
+
+    def _add_posts_by_new_users(self, size):
+        for _ in range(size):
+            index = models.Post.objects.count()
+            user = helpers.create_user(email=f"author{index}@example.com")
+            models.Post.objects.create(title="title", content="content", user=user)
+
+    def test_list_posts_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(BASE_POST_URL, {"page_size": size}),
+            self._add_posts_by_new_users,
+        )
+
+    def test_list_posts_with_cursor_query_budget(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(
+                BASE_POST_URL, {"pagination": "cursor", "page_size": size}
+            ),
+            self._add_posts_by_new_users,
+        )
+
+    def test_retrieve_post_query_budget(self):
+        def add_likes(size):
+            for index in range(size):
+                user = helpers.create_user(email=f"liker{size}-{index}@example.com")
+                helpers.create_like(post=self.post, user=user)
+
+        helpers.assert_query_budget(
+            self, lambda size: self.client.get(detail_url(self.post.id)), add_likes
+        )
+
+    def test_search_posts_ranks_title_and_content(self):
+        weak = models.Post.objects.create(
+            title="weekly notes", content="a short note about django", user=self.user
+        )
+        strong = models.Post.objects.create(
+            title="django tips", content="django django and more django", user=self.user
+        )
+        models.Post.objects.create(
+            title="unrelated", content="nothing to see", user=self.user
+        )
+
+        res = self.client.get(BASE_POST_URL, {"search": "Django"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 2)
+        self.assertEqual(
+            [post["id"] for post in res.data["results"]], [strong.id, weak.id]
+        )
+
+    def test_search_posts_paginates(self):
+        for index in range(3):
+            models.Post.objects.create(
+                title=f"search {index}", content="content", user=self.user
+            )
+
+        res = self.client.get(BASE_POST_URL, {"search": "search", "page_size": 2})
+
+        self.assertEqual(res.data["count"], 3)
+        self.assertEqual(len(res.data["results"]), 2)
+        self.assertEqual(res.data["next"], 2)
+
+    def test_search_posts_single_character(self):
+        res = self.client.get(BASE_POST_URL, {"search": "a"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_posts_without_match(self):
+        res = self.client.get(BASE_POST_URL, {"search": "zebra"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 0)
+
+    def test_search_posts_by_author_username(self):
+        author = helpers.create_user(email="writer@example.com", password="pass123")
+        by_author = models.Post.objects.create(
+            title="morning", content="nothing in common", user=author
+        )
+        mentions = models.Post.objects.create(
+            title="about the writer", content="content", user=self.user
+        )
+
+        res = self.client.get(BASE_POST_URL, {"search": "writer"})
+        prefix = self.client.get(BASE_POST_URL, {"search": "Writ"})
+
+        self.assertEqual(
+            [post["id"] for post in res.data["results"]], [mentions.id, by_author.id]
+        )
+        self.assertEqual(
+            [post["id"] for post in prefix.data["results"]], [by_author.id]
+        )
+
+    def test_search_posts_after_update(self):
+        url = detail_url(self.post.id)
+        self.client.patch(url, {"title": "renamed"}, format="json")
+
+        res = self.client.get(BASE_POST_URL, {"search": "renamed"})
+
+        self.assertEqual(res.data["count"], 1)
+        self.assertEqual(res.data["results"][0]["id"], self.post.id)
+
+    def test_retrieve_post_served_from_cache(self):
+        url = detail_url(self.post.id)
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], self.post.id)
+
+    def test_cached_post_invalidated_by_like_and_comment(self):
+        url = detail_url(self.post.id)
+        self.client.get(url)
+        self.client.get(BASE_POST_URL)
+
+        helpers.create_like(post=self.post, user=self.user)
+        helpers.create_comment(self.post, "content", self.user)
+
+        res = self.client.get(url)
+        self.assertEqual(res.data["like_count"], 1)
+        self.assertEqual(res.data["comment_count"], 1)
+
+        res = self.client.get(BASE_POST_URL)
+        self.assertEqual(res.data["results"][0]["like_count"], 1)
+
+    def test_cached_post_list_keyed_by_query_params(self):
+        models.Post.objects.create(title="other", content="content", user=self.user)
+        self.client.get(BASE_POST_URL, {"page_size": 1})
+
+        res = self.client.get(BASE_POST_URL, {"page_size": 2})
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_cached_post_list_with_file_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = "django.core.cache.backends.filebased.FileBasedCache"
+            with self.settings(
+                CACHES={"default": {"BACKEND": backend, "LOCATION": location}}
+            ):
+                self.client.get(BASE_POST_URL)
+                with self.assertNumQueries(0):
+                    self.client.get(BASE_POST_URL)
+
+                models.Post.objects.create(
+                    title="other", content="content", user=self.user
+                )
+                res = self.client.get(BASE_POST_URL)
+
+        self.assertEqual(res.data["count"], 2)
+
+    def test_retrieve_post_not_modified(self):
+        url = detail_url(self.post.id)
+        res = self.client.get(url)
+        etag = res["ETag"]
+        self.assertIn("Last-Modified", res)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+        self.assertEqual(res["ETag"], etag)
+
+    def test_retrieve_post_etag_changes_with_like(self):
+        url = detail_url(self.post.id)
+        etag = self.client.get(url)["ETag"]
+
+        helpers.create_like(post=self.post, user=self.user)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["like_count"], 1)
+
+    def test_list_posts_etag_depends_on_query_params(self):
+        etag = self.client.get(BASE_POST_URL)["ETag"]
+
+        res = self.client.get(BASE_POST_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_batch_retrieve_posts(self):
+        other = models.Post.objects.create(title="other", content="x", user=self.user)
+        url = reverse("post:post-batch")
+
+        with self.assertNumQueries(1):
+            res = self.client.get(url, {"ids": f"{other.id},999,{self.post.id}"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post["id"] for post in res.data["results"]], [other.id, self.post.id]
+        )
+        self.assertEqual(res.data["results"][1]["username"], "test")
+        self.assertEqual(res.data["missing"], [999])
+
+    def test_batch_retrieve_posts_invalid_ids(self):
+        url = reverse("post:post-batch")
+
+        self.assertEqual(
+            self.client.get(url, {"ids": "1,a"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(
+                url, {"ids": ",".join(map(str, range(1, 102)))}
+            ).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_trending_posts(self):
+        other = models.Post.objects.create(title="other", content="x", user=self.user)
+        helpers.create_like(post=self.post, user=self.user)
+        helpers.create_comment(other, "comment", self.user)
+        url = reverse("post:post-trending")
+
+        res = self.client.get(url, {"window": "1h"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["window"], "1h")
+        self.assertEqual(
+            [post["id"] for post in res.data["results"]], [other.id, self.post.id]
+        )
+        self.assertEqual(
+            [post["id"] for post in self.client.get(url, {"limit": 1}).data["results"]],
+            [other.id],
+        )
+
+    def test_trending_posts_invalid_params(self):
+        url = reverse("post:post-trending")
+
+        for params in ({"window": "2h"}, {"limit": "a"}, {"limit": 101}):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_posts_with_sparse_fields(self):
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(BASE_POST_URL, {"fields": "id,title,like_count"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data["results"][0]), {"id", "title", "like_count"})
+        select = [
+            query["sql"]
+            for query in context.captured_queries
+            if "core_post" in query["sql"] and "COUNT" not in query["sql"]
+        ]
+        self.assertTrue(select)
+        self.assertNotIn('"content"', select[-1])
+        self.assertNotIn("core_user", select[-1])
+
+    def test_retrieve_post_with_related_sparse_field(self):
+        res = self.client.get(detail_url(self.post.id), {"fields": "id,username"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"id": self.post.id, "username": "test"})
+
+    def test_retrieve_posts_with_cursor_and_sparse_fields(self):
+        helpers.assert_query_budget(
+            self,
+            lambda size: self.client.get(
+                BASE_POST_URL,
+                {"pagination": "cursor", "page_size": size, "fields": "title"},
+            ),
+            self._add_posts_by_new_users,
+        )
+
+    def test_retrieve_posts_with_unknown_field(self):
+        res = self.client.get(BASE_POST_URL, {"fields": "id,user,password"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_post_sets_request_user(self):
+        payload = {"title": "mine", "content": "content", "user": 999}
+
+        res = self.client.post(BASE_POST_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["username"], self.user.username)
+        self.assertEqual(models.Post.objects.get(pk=res.data["id"]).user, self.user)
+
+    def test_retrieve_posts_liked_and_commented_by_me(self):
+        other = models.Post.objects.create(title="other", content="x", user=self.user)
+        helpers.create_like(post=self.post, user=self.user)
+        helpers.create_comment(other, "comment", self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(BASE_POST_URL)
+
+        flags = {
+            post["id"]: (post["liked_by_me"], post["commented_by_me"])
+            for post in res.data["results"]
+        }
+        self.assertEqual(flags, {self.post.id: (True, False), other.id: (False, True)})
+
+    def test_liked_by_me_not_shared_between_users(self):
+        helpers.create_like(post=self.post, user=self.user)
+        self.assertTrue(self.client.get(detail_url(self.post.id)).data["liked_by_me"])
+
+        self.client.force_authenticate(user=self.post.user)
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertFalse(res.data["liked_by_me"])
+
+    def test_retrieve_posts_with_liked_by_me_sparse_field(self):
+        helpers.create_like(post=self.post, user=self.user)
+
+        res = self.client.get(BASE_POST_URL, {"fields": "id,liked_by_me"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"], [{"id": self.post.id, "liked_by_me": True}]
+        )
+
+    def test_stream_posts_matches_buffered_response(self):
+        for index in range(4):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.user
+            )
+        params = {"page_size": 2, "page": 2}
+
+        buffered = self.client.get(BASE_POST_URL, params)
+        streamed = self.client.get(BASE_POST_URL, {**params, "stream": "true"})
+
+        self.assertEqual(streamed.status_code, status.HTTP_200_OK)
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(
+            json.loads(b"".join(streamed.streaming_content)), buffered.json()
+        )
+
+    def test_stream_posts_reads_rows_by_primary_key(self):
+        for index in range(4):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.user
+            )
+        params = {"page_size": 2, "page": 2}
+        expected = self.client.get(BASE_POST_URL, params).json()
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(BASE_POST_URL, {**params, "stream": "true"})
+            body = json.loads(b"".join(res.streaming_content))
+
+        self.assertEqual(body, expected)
+        rows = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"core_post"."title"' in query["sql"]
+        ]
+        self.assertEqual(len(rows), 1)
+        self.assertIn(" IN (", rows[0])
+        self.assertNotIn("OFFSET", rows[0])
+
+    def test_stream_posts_with_cursor(self):
+        for index in range(4):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.user
+            )
+        first = self.client.get(BASE_POST_URL, {"pagination": "cursor", "page_size": 2})
+        params = {"cursor": first.data["next"], "page_size": 2}
+
+        buffered = self.client.get(BASE_POST_URL, params)
+        streamed = self.client.get(BASE_POST_URL, {**params, "stream": "1"})
+
+        self.assertEqual(
+            json.loads(b"".join(streamed.streaming_content)), buffered.json()
+        )
+
+    def test_stream_posts_from_page_size(self):
+        res = self.client.get(BASE_POST_URL, {"page_size": 5000})
+
+        self.assertTrue(res.streaming)
+        body = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(body["count"], 1)
+        self.assertEqual(body["results"][0]["id"], self.post.id)
+
+    def test_export_posts_of_request_user(self):
+        mine = models.Post.objects.create(title="mine", content="c", user=self.user)
+
+        res = self.client.get(reverse("post:post-export"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [
+            json.loads(line) for line in b"".join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["id"] for row in rows], [mine.id])
+
+    def test_export_posts_of_other_user_forbidden(self):
+        res = self.client.get(reverse("post:post-export"), {"user": self.post.user_id})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AsyncPostApiTests(TestCase):
+    def setUp(self):
+        self.post = helpers.create_post(title="test", content="testcontent")
+        token = CustomTokenObtainPairSerializer.get_token(self.post.user).access_token
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.post.user)
+
+    def async_get(self, url, data=None, headers=None):
+        return async_to_sync(self.async_client.get)(
+            url, data, headers=self.headers if headers is None else headers
+        )
+
+    def test_async_list_posts_matches_sync(self):
+        for index in range(3):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.post.user
+            )
+        params = {"page_size": 2, "page": 2}
+
+        res = self.async_get(reverse("post:async-post-list"), params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), self.client.get(BASE_POST_URL, params).json())
+
+    def test_async_retrieve_post_matches_sync(self):
+        res = self.async_get(
+            reverse("post:async-post-detail", kwargs={"pk": self.post.id})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), self.client.get(detail_url(self.post.id)).json())
+
+    def test_async_retrieve_post_not_found(self):
+        res = self.async_get(
+            reverse("post:async-post-detail", kwargs={"pk": self.post.id + 1})
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_list_posts_with_low_estimated_count(self):
+        for index in range(24):
+            models.Post.objects.create(
+                title=f"title{index}", content="content", user=self.post.user
+            )
+
+        with mock.patch.object(
+            counting.EstimatedCount, "get_estimate", return_value=12
+        ):
+            res = self.async_get(
+                reverse("post:async-post-list"), {"page_size": 10, "page": 3}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        body = res.json()
+        self.assertEqual((len(body["results"]), body["count"]), (5, 25))
+        self.assertEqual((body["next"], body["previous"]), (None, 2))
+
+    def test_async_list_posts_invalid_page(self):
+        res = self.async_get(reverse("post:async-post-list"), {"page": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(res.json(), {"detail": "Invalid page."})
+
+    def test_async_list_posts_unauthorized(self):
+        res = self.async_get(reverse("post:async-post-list"), headers={})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            res.json(), {"detail": "Authentication credentials were not provided."}
+        )
+
+    def test_async_list_posts_invalid_token(self):
+        res = self.async_get(
+            reverse("post:async-post-list"), headers={"Authorization": "Bearer bad"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_post_list_is_read_only(self):
+        res = async_to_sync(self.async_client.post)(
+            reverse("post:async-post-list"), {}, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
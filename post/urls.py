@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from post import views
@@ -7,4 +8,7 @@ app_name = "post"
 router = SimpleRouter()
 router.register(r"post", views.PostModelViewSet)
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("async/post/", views.async_post_list, name="async-post-list"),
+    path("async/post/<int:pk>/", views.async_post_detail, name="async-post-detail"),
+]
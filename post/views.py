@@ -1,15 +1,145 @@
+from asgiref.sync import sync_to_async
 from rest_framework import filters
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
 
-from core import models
-from core.view import BaseModelViewSet
+from core import async_views, counters, counting, models, trending
+from core.caching import VersionedResponseCacheMixin
+from core.search import FullTextSearchFilter
+from core.view import BaseModelViewSet, PendingCountersMixin
 from post import serializers
 
 
-class PostModelViewSet(BaseModelViewSet):
+class PostModelViewSet(
+    PendingCountersMixin, VersionedResponseCacheMixin, BaseModelViewSet
+):
     queryset = models.Post.objects.all()
     serializer_class = serializers.PostModelSerializer
+    select_related_fields = ("user",)
     http_method_names = ["get", "post", "patch", "delete"]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ["created_datetime"]
     ordering = ["-created_datetime"]
-    search_fields = ["user__username", "title"]
+    cursor_ordering = ("-created_datetime", "-id")
+    search_fields = ["title", "content", "^user__username"]
+    count_strategy_class = counting.EstimatedCount
+    fast_list_serializer = True
+    batch_max_ids = 100
+    trending_max_limit = 100
+    vary_on_user = True
+
+    def get_queryset(self):
+        fields = self.get_sparse_fields()
+        flags = [
+            flag for flag in models.VIEWER_FLAGS if fields is None or flag in fields
+        ]
+        return super().get_queryset().with_viewer_flags(self.request.user, flags)
+
+    @action(detail=False, methods=["get"], url_path="batch", url_name="batch")
+    def batch(self, request):
+        """
+        Returns the posts listed in ``?ids=1,5,9`` in the requested order, fetched with a single query.
+
+        Ids that do not exist are reported in ``missing`` instead of failing the whole request.
+        """
+        ids = self.get_batch_ids(request)
+        posts = self.get_queryset().in_bulk(ids)
+
+        serializer = self.get_serializer(
+            [posts[post_id] for post_id in ids if post_id in posts], many=True
+        )
+
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [post_id for post_id in ids if post_id not in posts],
+            }
+        )
+
+    def get_batch_ids(self, request) -> list:
+        raw = request.query_params.get("ids", "")
+        try:
+            ids = [int(value) for value in raw.split(",") if value.strip()]
+        except ValueError:
+            raise ValidationError({"ids": ["Expected a comma separated list of ids."]})
+
+        if not ids:
+            raise ValidationError({"ids": ["This parameter is required."]})
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > self.batch_max_ids:
+            raise ValidationError(
+                {"ids": [f"Ensure there are no more than {self.batch_max_ids} ids."]}
+            )
+        return ids
+
+    @action(detail=False, methods=["get"], url_path="trending", url_name="trending")
+    def trending(self, request):
+        """
+        Returns the top posts of ``?window=`` (1h, 24h or 7d) ranked by time-decayed likes and comments.
+
+        Ranks are maintained incrementally by ``core.trending``, so this reads ``?limit=`` rows of an index.
+        """
+        window = request.query_params.get("window", trending.DEFAULT_WINDOW)
+        if window not in trending.WINDOWS:
+            raise ValidationError(
+                {"window": [f"Expected one of {', '.join(trending.WINDOWS)}."]}
+            )
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        if not 1 <= limit <= self.trending_max_limit:
+            raise ValidationError(
+                {"limit": [f"Ensure this is between 1 and {self.trending_max_limit}."]}
+            )
+
+        ids = trending.top_post_ids(window, limit)
+        posts = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [posts[post_id] for post_id in ids if post_id in posts], many=True
+        )
+
+        return Response({"window": window, "results": serializer.data})
+
+    @action(detail=False, methods=["get"], url_path="export", url_name="export")
+    def export(self, request):
+        """
+        Streams every post of a user as NDJSON, the requesting user unless staff passes ``?user=<id>``.
+        """
+        user_id = request.query_params.get("user", request.user.id)
+        if str(user_id) != str(request.user.id) and not request.user.is_staff:
+            raise PermissionDenied("Only staff can export posts of other users.")
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            raise ValidationError({"user": ["A valid integer is required."]})
+
+        queryset = self.get_queryset().filter(user_id=user_id)
+        return self.get_export_response(queryset, f"posts-user-{user_id}.ndjson")
+
+
+@async_views.async_api_view
+async def async_post_list(request):
+    queryset = models.Post.objects.with_viewer_flags(request.user).order_by(
+        "-created_datetime", "-id"
+    )
+    page = await async_views.paginate(
+        request,
+        queryset,
+        serializers.PostModelSerializer,
+        counting.EstimatedCount(),
+    )
+    await sync_to_async(counters.merge_pending)(page["results"])
+    return async_views.json_response(page)
+
+
+@async_views.async_api_view
+async def async_post_detail(request, pk: int):
+    post = await async_views.detail(
+        models.Post.objects.with_viewer_flags(request.user),
+        pk,
+        serializers.PostModelSerializer,
+    )
+    await sync_to_async(counters.merge_pending)([post])
+    return async_views.json_response(post)
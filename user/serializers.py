@@ -3,6 +3,8 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, AuthUser
 from rest_framework_simplejwt.tokens import Token
 
+from core import hashing
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     class Meta:
@@ -46,7 +48,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = super().update(instance, validated_data)
 
         if password:
-            user.set_password(password)
+            hashing.run(user.set_password, password)
             user.save()
 
         return user
@@ -81,6 +83,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token["user_email"] = user.email
         token["user_name"] = user.name
         token["user_username"] = user.username
+        token["is_staff"] = user.is_staff
 
         return token
 
@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import generics, permissions
 
 from user import serializers
@@ -17,8 +18,14 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         operate upon. Typically, it uses self.kwargs, which is a dictionary of values
         that are captured from the URLconf and made available to this view.
 
+        Reads are authenticated from the token claims only (see core.authentication.ClaimsUser), which can be
+        older than the profile, so the row is loaded here when the request user is not a model instance.
+
         :param self: Refer to the current object
         :return: The user object
         :doc-author: Trelent
         """
-        return self.request.user
+        user = self.request.user
+        if not isinstance(user, get_user_model()):
+            user = get_user_model().objects.get(pk=user.pk)
+        return user